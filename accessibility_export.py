@@ -18,13 +18,31 @@ JSON files.
 import subprocess
 import time
 import os
+import sys
+import ctypes # For reading the process table through libproc
 import json
-from datetime import datetime
+import re
 from ApplicationServices import (
     AXUIElementCreateApplication,
     AXUIElementCopyAttributeValue,
+    AXUIElementCopyMultipleAttributeValues,
+    AXUIElementCopyParameterizedAttributeValue,
+    AXValueGetType,
+    AXValueRef,
     AXIsProcessTrusted,
+    AXObserverCreate,
+    AXObserverAddNotification,
+    AXObserverGetRunLoopSource,
+    kAXErrorSuccess,
+    kAXErrorInvalidUIElement,
+    kAXErrorCannotComplete,
+    kAXValueAXErrorType,
+    kAXValueChangedNotification,
+    kAXCreatedNotification,
+    kAXRowCountChangedNotification,
+    kAXUIElementDestroyedNotification,
     kAXChildrenAttribute,
+    kAXWindowAttribute,
     kAXTitleAttribute,
     kAXValueAttribute,
     kAXRoleAttribute,           # Explicitly import if used via constant AX_ROLE
@@ -35,25 +53,118 @@ from ApplicationServices import (
     kAXWindowRole,              # Explicitly import if used via string "AXWindow"
     kAXRowRole                  # Explicitly import if used via string "AXRow"
 )
-import copy
+from CoreFoundation import CFArrayCreate, CFStringCreateWithCString, kCFStringEncodingUTF8, kCFTypeArrayCallBacks
+from CoreFoundation import CFRunLoopAddSource, CFRunLoopGetCurrent, CFRunLoopRun, CFRunLoopStop, kCFRunLoopDefaultMode
+import hashlib # For detecting unchanged exports
+import contextlib # For the discovery snapshot context manager
+import functools # For memoizing pure helpers
+from collections import OrderedDict, deque # For breadth-first element searches and the app element cache
+from concurrent.futures import ThreadPoolExecutor # For probing processes concurrently
+from itertools import repeat
 import signal # For checking PID existence
+import select # For kqueue process-exit notifications
+import threading # For running the AXObserver run loop in the background
 import argparse # For verbosity flag
 import traceback # For detailed error printing
+try:
+    import orjson # Optional: much faster JSON encoding for large exports
+except ImportError:
+    orjson = None
 
 # --- Accessibility Attribute Constants ---
-AX_ROLE = kAXRoleAttribute
-AX_SUBROLE = kAXSubroleAttribute
-AX_DESCRIPTION = kAXDescriptionAttribute
-AX_HELP = kAXHelpAttribute
-AX_LABEL_VALUE = kAXLabelValueAttribute
-AX_VALUE = kAXValueAttribute
-AX_TITLE = kAXTitleAttribute
-AX_CHILDREN = kAXChildrenAttribute
+def _cf_attribute(name):
+    """ Bridges an attribute name to a CFString once, so AX calls don't re-convert the str each time. """
+    return CFStringCreateWithCString(None, name.encode("utf-8"), kCFStringEncodingUTF8)
+
+AX_ROLE = _cf_attribute(kAXRoleAttribute)
+AX_SUBROLE = _cf_attribute(kAXSubroleAttribute)
+AX_DESCRIPTION = _cf_attribute(kAXDescriptionAttribute)
+AX_HELP = _cf_attribute(kAXHelpAttribute)
+AX_LABEL_VALUE = _cf_attribute(kAXLabelValueAttribute)
+AX_VALUE = _cf_attribute(kAXValueAttribute)
+AX_TITLE = _cf_attribute(kAXTitleAttribute)
+AX_CHILDREN = _cf_attribute(kAXChildrenAttribute)
+AX_WINDOW = _cf_attribute(kAXWindowAttribute)
 AX_WINDOW_ROLE = kAXWindowRole
 AX_ROW_ROLE = kAXRowRole
 
+# Attributes captured for every serialized element, in the order they are
+# requested from AXUIElementCopyMultipleAttributeValues (one IPC per element).
+SERIALIZED_ATTRIBUTE_KEYS = ("role", "subrole", "title", "value", "description", "help", "label")
+SERIALIZED_ATTRIBUTE_NAMES = (AX_ROLE, AX_SUBROLE, AX_TITLE, AX_VALUE, AX_DESCRIPTION, AX_HELP, AX_LABEL_VALUE)
+# The same batch with AXChildren appended (last slot), so descending costs no extra call
+SERIALIZE_BATCH_ATTRIBUTES = SERIALIZED_ATTRIBUTE_NAMES + (AX_CHILDREN,)
+# Prebuilt CFArray of the batch, passed to every serialize call so PyObjC doesn't rebuild it per node
+SERIALIZE_BATCH_CFARRAY = CFArrayCreate(None, SERIALIZE_BATCH_ATTRIBUTES, len(SERIALIZE_BATCH_ATTRIBUTES), kCFTypeArrayCallBacks)
+
+# Read together for each application child when listing windows
+WINDOW_BATCH_ATTRIBUTES = (AX_ROLE, AX_TITLE)
+
+# Map criteria keys (as used in SERIALIZATION_PRESETS "target_criteria") to attribute constants
+CRITERIA_ATTRIBUTES = {
+    "role": AX_ROLE, "subrole": AX_SUBROLE, "title": AX_TITLE,
+    "description": AX_DESCRIPTION, "value": AX_VALUE, "help": AX_HELP,
+    "label": AX_LABEL_VALUE
+    # Add other attributes here if needed for criteria matching
+}
+
+# Roles that the AX server can search for natively via AXUIElementsForSearchPredicate
+# (supported by web areas: Safari/WebKit, Chrome and Electron apps)
+AX_SEARCH_PREDICATE_ATTRIBUTE = "AXUIElementsForSearchPredicate"
+ROLE_SEARCH_KEYS = {
+    "AXTable": "AXTableSearchKey",
+    "AXStaticText": "AXStaticTextSearchKey",
+    "AXButton": "AXButtonSearchKey",
+    "AXLink": "AXLinkSearchKey",
+    "AXTextField": "AXTextFieldSearchKey",
+    "AXList": "AXListSearchKey",
+    "AXCheckBox": "AXCheckBoxSearchKey",
+}
+
 # --- Configuration ---
 BASE_EXPORT_DIR_NAME = "exports" # Base directory name for saving exports
+PROCESS_SNAPSHOT_TTL = 2.0 # Seconds a process-table snapshot is reused before re-reading it
+WINDOW_SEARCH_WORKERS = 8 # Threads used to probe processes when searching all window titles
+OBSERVER_HEARTBEAT = 60 # Max seconds between periodic exports when change notifications are active
+MAX_RETRY_BACKOFF = 300 # Max seconds between periodic retries while the target can't be found
+EXPORT_WRITE_BUFFER = 1 << 20 # Bytes buffered before the streaming writer hits the disk
+WINDOW_SEARCH_REUSE_TTL = 10.0 # Seconds a window search's matches may be narrowed in memory instead of searched again
+CANDIDATE_MISS_CYCLES = 3 # Cycles a candidate window without the target is skipped before searching it again
+# Executables that can't own windows, skipped by the all-apps window search (each would cost a failed AX round-trip)
+NON_GUI_PATH_PREFIXES = (
+    "/usr/libexec/", "/usr/sbin/", "/usr/bin/", "/sbin/", "/bin/",
+    "/System/Library/PrivateFrameworks/", "/System/Library/Frameworks/",
+)
+NON_GUI_PATH_FRAGMENTS = (
+    ".xpc/Contents/MacOS/",     # XPC services, in or out of an app bundle
+    ".app/Contents/Frameworks/", # Helpers nested in an app's frameworks (e.g. browser renderers)
+)
+NON_GUI_EXECUTABLES = frozenset({"kernel_task", "launchd", "login", "loginwindow", "sh", "bash", "zsh", "fish", "tmux"})
+
+# Notifications (registered on the application element) that mean the exported tree may have changed
+CHANGE_NOTIFICATIONS = (
+    kAXValueChangedNotification,
+    kAXCreatedNotification,
+    kAXRowCountChangedNotification,
+    kAXUIElementDestroyedNotification,
+)
+
+# --- libproc / sysctl Constants (from <libproc.h> and <sys/sysctl.h>) ---
+PROC_ALL_PIDS = 1
+PROC_PIDPATHINFO_MAXSIZE = 4096
+CTL_KERN = 1
+KERN_ARGMAX = 8
+KERN_PROCARGS2 = 49
+_PS_LINE_RE = re.compile(rb"^\s*(\d+)\s+(.*\S)", re.M) # "<pid> <value>" lines of `ps -o pid=,...=`
+
+# Purely decorative roles whose subtrees never carry transcript text. Presets can
+# list these under "prune_roles" so the serializer skips them (and their children)
+# entirely. Entries may be a role string or a (role, subrole) tuple.
+DECORATIVE_ROLES = frozenset({
+    "AXScrollBar",      # Scroll bars and their AXValueIndicator thumbs
+    "AXSplitter",       # Split view dividers
+    "AXGrowArea",       # Window resize handles
+})
 
 # --- App Context Presets ---
 # Define how to find the initial target application or window.
@@ -90,9 +201,23 @@ APP_CONTEXTS = {
      }
 }
 
+# --- Stage 1 Menu ---
+# Built once at import: the selection order (presets, then manual options) and
+# its formatted menu text. APP_CONTEXTS doesn't change while running.
+_preset_keys = sorted(k for k, c in APP_CONTEXTS.items() if not c.get("find_method", "").startswith("manual_"))
+_manual_keys = sorted(k for k, c in APP_CONTEXTS.items() if c.get("find_method", "").startswith("manual_"))
+_CONTEXT_INDEX = _preset_keys + _manual_keys # Position in this list is the menu choice number
+_CONTEXT_MENU = "\n".join(
+    ["--- Presets ---"]
+    + ([f"  [{i}] {key}" for i, key in enumerate(_preset_keys)] or ["  (No presets defined)"])
+    + ["", "--- Manual Options ---"]
+    + ([f"  [{i}] {key}" for i, key in enumerate(_manual_keys, start=len(_preset_keys))]
+       or [" (No manual options defined)"])
+)
+del _preset_keys, _manual_keys
+
 # --- Serialization Presets ---
 # Define what to serialize once the initial element is found.
-# --- Serialization Presets ---
 SERIALIZATION_PRESETS = {
     "Full Element Found": {
         "description": "Serialize the entire App/Window element found by the context.",
@@ -107,17 +232,29 @@ SERIALIZATION_PRESETS = {
         "applicable_contexts": ["Zoom Transcript Window"],
         "default_depth": 25,
         "default_interval": 30,
-        "text_line_roles": ["AXTextArea"] # Count AXTextArea elements in Zoom transcript
+        "text_line_roles": ["AXTextArea"], # Count AXTextArea elements in Zoom transcript
+        "depth_cushion": 4, # Later periodic searches stop this far below where the target was found
+        "serialized_attributes": ("role", "value", "description"), # All the transcript converter reads
+        "prune_roles": DECORATIVE_ROLES # Skip subtrees that never hold transcript text
     },
     "Teams Live Captions Group": {
         "description": "Finds and serializes the AXGroup containing Teams Live Captions.",
         "target_criteria": {"role": "AXGroup", "description": "Live Captions"},
         "default_depth": 50,
         "default_interval": 30,
-        "text_line_roles": ["AXStaticText"] # Count AXStaticText elements in Teams captions
+        "text_line_roles": ["AXStaticText"], # Count AXStaticText elements in Teams captions
+        "depth_cushion": 4, # Later periodic searches stop this far below where the target was found
+        "serialized_attributes": ("role", "value", "description"), # All the transcript converter reads
+        "prune_roles": DECORATIVE_ROLES # Skip subtrees that never hold caption text
     },
 }
 
+# --- Module State ---
+_libsystem = None # ctypes handle for libSystem (False if unavailable), loaded lazily
+_process_snapshot = None # (monotonic timestamp, {pid: (exe_path, command)})
+_discovery_windows = None # {app_element: window list} while inside ax_discovery_snapshot(), else None
+_accessibility_trusted = False # Set once AXIsProcessTrusted() has returned True
+
 # --- Helper Functions ---
 
 def verbose_print(args, *print_args, **print_kwargs):
@@ -144,168 +281,667 @@ def get_attribute(element, attr):
     # Return None for any error, including attribute not supported
     return None
 
-def serialize_ax_element(element, depth=0, max_depth=50, text_roles_to_count=None):
+def element_is_valid(element):
+    """
+    Cheaply checks whether a previously found AXUIElement still refers to live UI.
+
+    Args:
+        element: The AXUIElement to check.
+
+    Returns:
+        False if the element is gone (invalid) or its application no longer
+        answers; True otherwise.
+    """
+    if not element:
+        return False
+    result, _ = AXUIElementCopyAttributeValue(element, AX_ROLE, None)
+    return result not in (kAXErrorInvalidUIElement, kAXErrorCannotComplete)
+
+def is_accessibility_trusted():
     """
-    Recursively serializes an accessibility element and its children into a dictionary.
+    Checks (once) whether this process has been granted Accessibility access.
+
+    Only a positive answer is cached, so a denied check is re-queried next time.
+
+    Returns:
+        True if the process is trusted for Accessibility, otherwise False.
+    """
+    global _accessibility_trusted
+    if not _accessibility_trusted:
+        _accessibility_trusted = bool(AXIsProcessTrusted())
+    return _accessibility_trusted
+
+def get_attributes(element, attrs):
+    """
+    Safely retrieves several accessibility attribute values in a single call.
+
+    Uses AXUIElementCopyMultipleAttributeValues so all attributes come back in
+    one round-trip to the accessibility server instead of one per attribute.
+
+    Args:
+        element: The AXUIElement to query.
+        attrs: A sequence of accessibility attribute constants.
+
+    Returns:
+        A list of values aligned with `attrs`, with None in place of any
+        attribute that could not be read (or all None if the call failed).
+    """
+    if not element or not attrs:
+        return [None] * len(attrs)
+    # Options 0: keep going past per-attribute errors, reporting them in their slot
+    result, values = AXUIElementCopyMultipleAttributeValues(element, attrs, 0, None)
+    if result != 0 or values is None:
+        return [None] * len(attrs)
+    # Failed attributes are returned as AXValueRefs wrapping an AXError code
+    return [
+        None if isinstance(value, AXValueRef) and AXValueGetType(value) == kAXValueAXErrorType else value
+        for value in values
+    ]
+
+def serialize_ax_element(element, depth=0, max_depth=50, text_roles_to_count=None, prune_roles=None, attributes=None):
+    """
+    Serializes an accessibility element and its children into a dictionary.
+
+    Walks the tree depth-first with an explicit stack rather than recursion, so
+    deep trees don't pay Python frame overhead or run into the recursion limit.
 
     Args:
         element: The starting AXUIElement.
-        depth: Current recursion depth.
-        max_depth: Maximum recursion depth.
+        depth: Depth of the starting element.
+        max_depth: Maximum traversal depth.
         text_roles_to_count: Optional list of AXRole strings to count as relevant text elements.
+        prune_roles: Optional set of roles (or (role, subrole) tuples) whose elements
+                     are skipped along with their whole subtree.
+        attributes: Optional sequence of attribute keys to serialize (see
+                    SERIALIZED_ATTRIBUTE_KEYS); defaults to all of them.
 
     Returns:
         A tuple containing:
         - A dictionary representing the element and its children (or None if empty/error).
         - An integer count of elements whose role matched one in text_roles_to_count.
     """
-    if not element or depth > max_depth:
-        # Return 0 count if max depth reached or element is invalid
-        return ({"error": f"<Max depth {max_depth} reached>"} if depth > max_depth else None), 0
-
-    # Initialize count for this level
-    text_element_count = 0
-    data = {}
     # Ensure text_roles_to_count is a list/set for efficient lookup, even if None was passed
     roles_to_count_set = set(text_roles_to_count) if text_roles_to_count else set()
+    prune_roles = prune_roles or frozenset()
+    batch = _serialize_batch(tuple(attributes) if attributes else None)
+    unread_subrole_roles = _unread_subrole_roles(prune_roles, batch)
+    text_element_count = 0
 
-    # Attributes to attempt to serialize for the current element
-    attributes_to_check = {
-        "role": AX_ROLE, "subrole": AX_SUBROLE, "title": AX_TITLE,
-        "value": AX_VALUE, "description": AX_DESCRIPTION, "help": AX_HELP,
-        "label": AX_LABEL_VALUE,
-    }
+    root_holder = [] # Receives the serialized root, like any parent's children list
+    # Stack entries: (element, depth, parent_children_list) for elements still to visit,
+    # or (None, data, parent_children_list) to finalize a node once its children are done.
+    stack = [(element, depth, root_holder)]
 
-    current_element_role = None # Store role for counting check
+    while stack:
+        current, current_depth, parent_list = stack.pop()
 
-    for key, attr_name in attributes_to_check.items():
-        try:
-            value = get_attribute(element, attr_name)
-            if value is not None:
-                # Store simple types or represent complex ones safely
-                if isinstance(value, str) and value:
-                    data[key] = value
-                elif isinstance(value, (int, float, bool)):
-                    data[key] = value
-                elif not isinstance(value, str): # Handle non-string, non-simple types
-                    try:
-                        data[key] = repr(value) # Fallback representation
-                    except Exception:
-                        data[key] = "<Unrepresentable CFType>"
-
-                # Store the role if found
-                if key == "role" and isinstance(value, str):
-                   current_element_role = value
+        if current is None:
+            # All children of this node have been visited: drop empty results
+            data = current_depth
+            if not data["children"]:
+                del data["children"]
+                if not _has_real_data(data):
+                    parent_list.pop() # The node is always the last one appended to its parent
+            continue
 
-        except Exception as e:
-            # Record error if attribute fetching fails unexpectedly
-            data[f"{key}_error"] = f"Error fetching {attr_name}: {e}"
+        if not current:
+            continue # Invalid element, nothing to serialize
+        if current_depth > max_depth:
+            parent_list.append({"error": f"<Max depth {max_depth} reached>"})
+            continue
 
-    # --- New Counting Logic ---
-    # Check if the current element's role is one we should count
-    if current_element_role and current_element_role in roles_to_count_set:
-        text_element_count += 1
-        # Optional: Add a marker to the serialized data itself?
-        # data["is_counted_text"] = True
+        data, current_element_role, children = _read_node(current, batch)
 
-    # Recursively serialize children
-    try:
-        children = get_attribute(element, AX_CHILDREN)
+        # Skip ignored elements without descending into their children
+        if _is_pruned(current_element_role, data, prune_roles, current, unread_subrole_roles):
+            continue
+
+        # Check if the current element's role is one we should count
+        if current_element_role and current_element_role in roles_to_count_set:
+            text_element_count += 1
+
+        # Queue children for serialization
         if children:
-            children_data = []
-            for child in children:
-                # Recursive call, passing down the roles to count
-                child_data, child_count = serialize_ax_element(
-                    child,
-                    depth + 1,
-                    max_depth,
-                    text_roles_to_count=text_roles_to_count # Pass the original list/None
-                )
-                if child_data:  # Append only if child serialization returned data
-                    children_data.append(child_data)
-                # Accumulate count from children
-                text_element_count += child_count
-            if children_data:
-                data["children"] = children_data
-    except Exception as e:
-        data["children_error"] = f"Error fetching children: {e}"
+            # Attach now so sibling order is preserved; empty nodes are removed on finalize
+            data["children"] = []
+            parent_list.append(data)
+            stack.append((None, data, parent_list))
+            # Push in reverse so children are visited in their original order
+            for child in reversed(children):
+                stack.append((child, current_depth + 1, data["children"]))
+        elif _has_real_data(data):
+            parent_list.append(data)
 
-    # Only return data if it contains meaningful information beyond errors
-    has_real_data = any(not k.endswith("_error") for k in data if k != "children") or "children" in data
     # Return data and the accumulated count
-    return data if has_real_data else None, text_element_count
+    return (root_holder[0] if root_holder else None), text_element_count
+
+
+def _has_real_data(data):
+    """Returns True if a serialized node holds information beyond errors."""
+    # "attributes_error" is the only error key _read_node records, so no per-key scan is needed
+    return len(data) > ("attributes_error" in data)
 
 
-def find_element_by_criteria(start_element, criteria, args, current_depth=0, max_search_depth=50):
+@functools.lru_cache(maxsize=None)
+def _serialize_batch(keys):
     """
-    Recursively searches (Depth First Search) for the first element matching all specified criteria.
+    Builds the batched read for a selection of serialized attribute keys.
+
+    Args:
+        keys: A tuple of attribute keys (see SERIALIZED_ATTRIBUTE_KEYS), or None for all.
+
+    Returns:
+        A tuple (keys, attributes): the keys with "role" first (it drives pruning
+        and counting), and a CFArray of their attributes followed by AXChildren.
+    """
+    if keys is None:
+        return SERIALIZED_ATTRIBUTE_KEYS, SERIALIZE_BATCH_CFARRAY
+    keys = ("role",) + tuple(key for key in SERIALIZED_ATTRIBUTE_KEYS if key in keys and key != "role")
+    names = tuple(CRITERIA_ATTRIBUTES[key] for key in keys) + (AX_CHILDREN,)
+    return keys, CFArrayCreate(None, names, len(names), kCFTypeArrayCallBacks)
+
+
+def _read_node(element, batch=None):
+    """
+    Reads one element's serialized attributes and children in a single batched call.
+
+    Args:
+        element: The AXUIElement to read.
+        batch: Optional (keys, attributes) pair from _serialize_batch; defaults to all attributes.
+
+    Returns:
+        A tuple (data, role, children): the attribute dictionary (without
+        children), the element's role string (or None), and its AXChildren.
+    """
+    keys, batch_attributes = batch or (SERIALIZED_ATTRIBUTE_KEYS, SERIALIZE_BATCH_CFARRAY)
+    data = {}
+
+    try:
+        # Attributes and children come back together in a single round-trip
+        values = get_attributes(element, batch_attributes)
+    except Exception as e:
+        # Record error if the batched attribute fetch fails unexpectedly
+        data["attributes_error"] = f"Error fetching attributes: {e}"
+        values = [None] * (len(keys) + 1)
+
+    for key, value in zip(keys, values):
+        if value is None:
+            continue
+        # Store simple types or represent complex ones safely (one type check per common case;
+        # isinstance, not type(), since PyObjC hands back str/int subclasses)
+        if isinstance(value, str):
+            if value: # Empty strings are omitted
+                data[key] = value
+        elif isinstance(value, (int, float)): # Includes bool
+            # Store plain numbers: PyObjC's NSNumber subclasses (e.g. OC_PythonFloat) aren't
+            # accepted by orjson
+            if type(value) not in (int, float, bool):
+                value = int(value) if isinstance(value, int) else float(value)
+            data[key] = value
+        else: # Handle non-string, non-simple types
+            try:
+                data[key] = repr(value) # Fallback representation
+            except Exception:
+                data[key] = "<Unrepresentable CFType>"
+
+    # Role is the first slot of the batch; keep it for the prune and counting checks
+    role = values[0] if isinstance(values[0], str) else None
+    return data, role, values[-1]
+
+
+def _unread_subrole_roles(prune_roles, batch):
+    """
+    Returns the roles of (role, subrole) prune entries whose subrole the batch doesn't read.
+
+    Args:
+        prune_roles: Set of roles and (role, subrole) tuples to skip.
+        batch: The (keys, attributes) pair from _serialize_batch.
+
+    Returns:
+        A frozenset of roles for which _is_pruned must read AXSubrole itself.
+    """
+    if "subrole" in batch[0]:
+        return frozenset()
+    return frozenset(entry[0] for entry in prune_roles if isinstance(entry, tuple))
+
+
+def _is_pruned(role, data, prune_roles, element=None, unread_subrole_roles=frozenset()):
+    """
+    Returns True if an element (and its subtree) should be skipped per prune_roles.
+
+    Args:
+        role: The element's role string (or None).
+        data: The element's serialized attributes.
+        prune_roles: Set of roles and (role, subrole) tuples to skip.
+        element: The AXUIElement, used to read AXSubrole when the batch left it out.
+        unread_subrole_roles: Roles (from _unread_subrole_roles) whose subrole has to
+                              be read separately; only those elements pay the extra call.
+    """
+    if not (role and prune_roles):
+        return False
+    if role in prune_roles:
+        return True
+    if role in unread_subrole_roles:
+        subrole = get_attribute(element, AX_SUBROLE)
+    else:
+        subrole = data.get("subrole")
+    return (role, subrole) in prune_roles
+
+
+def _encode_json(value):
+    """Encodes a single JSON value to UTF-8 bytes (orjson when available)."""
+    # Floats always go through json: orjson spells some differently (1e16, null for NaN)
+    if orjson and type(value) is not float:
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            pass # Values orjson refuses (e.g. ints beyond 64 bits) are left to json
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def _encode_items(data, level):
+    """Encodes a dict's key/value pairs as json.dumps(..., indent=2) lays them out at `level`."""
+    inner = b"\n" + b"  " * (level + 1)
+    return b",".join(inner + _encode_json(k) + b": " + _encode_json(v) for k, v in data.items())
+
+
+def _encode_leaf(data, level):
+    """Encodes a childless node dict exactly as json.dumps(..., indent=2) would at `level`."""
+    return b"{" + _encode_items(data, level) + b"\n" + b"  " * level + b"}"
+
+
+class _PendingNode:
+    """An element with children, held by stream_ax_element until its subtree is done."""
+    __slots__ = ("data", "level", "parent", "opened", "written")
+
+    def __init__(self, data, level, parent):
+        self.data = data       # Attribute dict (without children)
+        self.level = level     # Indent level of the node's opening brace
+        self.parent = parent   # Enclosing _PendingNode, or None for the root
+        self.opened = False    # True once the node's header has been written
+        self.written = 0       # Number of children written so far
+
+
+def stream_ax_element(element, out, depth=0, max_depth=50, text_roles_to_count=None, prune_roles=None, attributes=None):
+    """
+    Serializes an accessibility element tree straight to a binary file as indented JSON.
+
+    Produces the same document as json.dump(serialize_ax_element(...)[0], indent=2)
+    but writes each node as soon as it is known to be non-empty, so only the
+    current path (not the whole tree) is held in memory. A node with no data of
+    its own is written only once one of its descendants is.
+
+    Args:
+        element: The starting AXUIElement.
+        out: A binary file-like object to write to.
+        depth: Depth of the starting element.
+        max_depth: Maximum traversal depth.
+        text_roles_to_count: Optional list of AXRole strings to count as relevant text elements.
+        prune_roles: Optional set of roles (or (role, subrole) tuples) to skip with their subtree.
+        attributes: Optional sequence of attribute keys to serialize; defaults to all of them.
+
+    Returns:
+        A tuple containing:
+        - True if anything was written (False means the tree serialized to nothing).
+        - An integer count of elements whose role matched one in text_roles_to_count.
+    """
+    roles_to_count_set = set(text_roles_to_count) if text_roles_to_count else set()
+    prune_roles = prune_roles or frozenset()
+    batch = _serialize_batch(tuple(attributes) if attributes else None)
+    unread_subrole_roles = _unread_subrole_roles(prune_roles, batch)
+    text_element_count = 0
+    wrote_root = False
+
+    def write_child(parent, payload):
+        nonlocal wrote_root
+        if parent is None:
+            out.write(payload)
+            wrote_root = True
+            return
+        open_node(parent)
+        out.write((b",\n" if parent.written else b"\n") + b"  " * (parent.level + 2) + payload)
+        parent.written += 1
+
+    def open_node(node):
+        # Write the headers of this node and any not-yet-written ancestors, outermost first
+        chain = []
+        while node is not None and not node.opened:
+            chain.append(node)
+            node = node.parent
+        for pending in reversed(chain):
+            items = _encode_items(pending.data, pending.level)
+            header = b"{" + items + (b"," if items else b"") + b"\n" + b"  " * (pending.level + 1) + b'"children": ['
+            write_child(pending.parent, header)
+            pending.opened = True
+
+    stack = [(element, depth, None)]
+    while stack:
+        current, current_depth, parent = stack.pop()
+
+        if current is None:
+            # All children of this node have been visited
+            node = current_depth
+            if node.opened:
+                out.write(b"\n" + b"  " * (node.level + 1) + b"]\n" + b"  " * node.level + b"}")
+            elif _has_real_data(node.data):
+                write_child(node.parent, _encode_leaf(node.data, node.level))
+            continue
+
+        if not current:
+            continue # Invalid element, nothing to serialize
+        level = parent.level + 2 if parent is not None else 0
+        if current_depth > max_depth:
+            write_child(parent, _encode_leaf({"error": f"<Max depth {max_depth} reached>"}, level))
+            continue
+
+        data, current_element_role, children = _read_node(current, batch)
+        if _is_pruned(current_element_role, data, prune_roles, current, unread_subrole_roles):
+            continue
+        if current_element_role and current_element_role in roles_to_count_set:
+            text_element_count += 1
+
+        if children:
+            node = _PendingNode(data, level, parent)
+            stack.append((None, node, None))
+            for child in reversed(children):
+                stack.append((child, current_depth + 1, node))
+        elif _has_real_data(data):
+            write_child(parent, _encode_leaf(data, level))
+
+    return wrote_root, text_element_count
+
+
+def compile_criteria(criteria):
+    """
+    Resolves a criteria dict into a tuple of (key, attribute, expected_value) triples.
+
+    The most discriminating criterion ("role") is placed first. Compile once and
+    pass the result to find_element_by_criteria when the same criteria are
+    searched repeatedly (e.g., every export cycle or every candidate window).
+
+    Args:
+        criteria: A dictionary of criteria keys (see CRITERIA_ATTRIBUTES) to expected values.
+
+    Returns:
+        A tuple of (key, attr_name, expected_value) triples, or None if criteria
+        is empty or contains an unknown key.
+    """
+    if not criteria:
+        return None
+    compiled = []
+    for key, expected_value in sorted(criteria.items(), key=lambda item: item[0] != "role"):
+        attr_name = CRITERIA_ATTRIBUTES.get(key)
+        if not attr_name:
+            print(f"Warning: Unknown criteria key '{key}'")
+            return None # Cannot match an unknown attribute
+        compiled.append((key, attr_name, expected_value))
+    return tuple(compiled)
+
+
+def find_element_by_criteria(start_element, criteria, args, current_depth=0, max_search_depth=50, return_depth=False):
+    """
+    Searches (Breadth First Search) for the first element matching all specified criteria.
+
+    Elements are visited level by level, so a shallow target (such as a window's
+    transcript table) is found without first descending into deep sibling subtrees.
 
     Args:
         start_element: The AXUIElement to start searching from.
         criteria: A dictionary where keys are attribute names (e.g., "role", "description")
-                  and values are the expected values.
+                  and values are the expected values, or the tuple returned by compile_criteria.
         args: Command line arguments (for verbose_print).
-        current_depth: Current search depth (for recursion control).
+        current_depth: Depth of the starting element.
         max_search_depth: Maximum depth to search.
+        return_depth: If True, return an (element, depth) tuple instead of just the element.
 
     Returns:
-        The first matching AXUIElement found, or None if not found or max depth reached.
+        The shallowest matching AXUIElement found, or None if not found or max depth reached.
+        With return_depth, a tuple (element, depth), or (None, None) if not found.
     """
-    if not start_element or not criteria or current_depth > max_search_depth:
-        return None
+    not_found = (None, None) if return_depth else None
+    if not start_element or not criteria:
+        return not_found
+
+    # Criteria are checked role-first, so most elements fail on a single fetch
+    resolved_criteria = criteria if isinstance(criteria, tuple) else compile_criteria(criteria)
+    if not resolved_criteria:
+        return not_found
+    first_key, first_attr, first_expected = resolved_criteria[0]
+    rest_criteria = resolved_criteria[1:]
+    rest_attrs = [attr_name for _, attr_name, _ in rest_criteria]
+    first_batch = (first_attr, AX_CHILDREN)
+
+    # Per-node log lines are only formatted when verbose (f-strings are built before the call)
+    verbose = args.verbose
+    queue = deque([(start_element, current_depth)])
+    while queue:
+        element, depth = queue.popleft()
+        if not element or depth > max_search_depth:
+            continue
+
+        if verbose: print(f"{'  ' * depth} Searching element at depth {depth} for {criteria}...")
+
+        # Check the first criterion (fetched together with the children, which are
+        # needed on a mismatch); only fetch the rest of the criteria if it matches
+        actual_value, children = get_attributes(element, first_batch)
+        if verbose: print(f"{'  ' * depth}   Attr '{first_key}': Expected='{first_expected}', Actual='{actual_value}'")
+        match = actual_value == first_expected
+
+        if match and rest_criteria:
+            # Fetch the remaining criteria attributes in one batched call, then compare
+            actual_values = get_attributes(element, rest_attrs)
+            for (key, _, expected_value), actual_value in zip(rest_criteria, actual_values):
+                if verbose: print(f"{'  ' * depth}   Attr '{key}': Expected='{expected_value}', Actual='{actual_value}'")
+
+                # Perform comparison (handle potential type differences if necessary, though usually strings)
+                if actual_value != expected_value:
+                    match = False
+                    break # Stop checking criteria for this element if one fails
+
+        if match:
+            if verbose: print(f"{'  ' * depth}   🎉 Match found!")
+            return (element, depth) if return_depth else element # Found the target element
+
+        if verbose: print(f"{'  ' * depth}   No match at this level. Checking children...")
+
+        # If not matched, queue children behind the rest of this level
+        if children and depth < max_search_depth:
+            if verbose: print(f"{'  ' * depth}   Found {len(children)} children.")
+            queue.extend(zip(children, repeat(depth + 1)))
+
+    verbose_print(args, f"   No match found for {criteria}.")
+    return not_found # Not found in this element or its descendants
+
+
+def find_element_by_search_predicate(container_element, criteria, args):
+    """
+    Finds the first element matching the criteria using the AX server's own search.
 
-    verbose_print(args, f"{'  ' * current_depth} Searching element at depth {current_depth} for {criteria}...")
+    For criteria whose role has a native search key (see ROLE_SEARCH_KEYS), a
+    single AXUIElementsForSearchPredicate request returns every element of that
+    kind under the container; only those candidates are then checked against
+    the remaining criteria. Applications that don't implement the parameterized
+    attribute (most native Cocoa apps) report it as unsupported.
 
-    match = True
-    element_attrs = {}
+    Args:
+        container_element: The AXUIElement to search under.
+        criteria: A criteria dictionary or the tuple returned by compile_criteria.
+        args: Command line arguments (for verbose_print).
 
-    # Map criteria keys to Accessibility API constants
-    criteria_map = {
-        "role": AX_ROLE, "subrole": AX_SUBROLE, "title": AX_TITLE,
-        "description": AX_DESCRIPTION, "value": AX_VALUE, "help": AX_HELP,
-        "label": AX_LABEL_VALUE
-        # Add other attributes here if needed for criteria matching
+    Returns:
+        A tuple (supported, element): supported is False if the criteria have no
+        search key or the application rejected the request (callers should fall
+        back to find_element_by_criteria); element is the first match or None.
+    """
+    resolved_criteria = criteria if isinstance(criteria, tuple) else compile_criteria(criteria)
+    if not container_element or not resolved_criteria:
+        return False, None
+    expected_role = next((expected for key, _, expected in resolved_criteria if key == "role"), None)
+    search_key = ROLE_SEARCH_KEYS.get(expected_role)
+    if not search_key:
+        return False, None
+
+    predicate = {
+        "AXSearchKey": search_key,
+        "AXDirection": "AXDirectionNext",
+        "AXResultsLimit": -1, # All matches, in document order
+        "AXImmediateDescendantsOnly": False,
     }
+    try:
+        result, candidates = AXUIElementCopyParameterizedAttributeValue(
+            container_element, AX_SEARCH_PREDICATE_ATTRIBUTE, predicate, None)
+    except Exception as e:
+        verbose_print(args, f"   Search predicate request failed: {e}")
+        return False, None
+    if result != kAXErrorSuccess or candidates is None:
+        verbose_print(args, f"   Search predicate not supported here (error {result}).")
+        return False, None
+
+    verbose_print(args, f"   Search predicate returned {len(candidates)} '{search_key}' candidates.")
+    attrs = [attr_name for _, attr_name, _ in resolved_criteria]
+    for candidate in candidates:
+        actual_values = get_attributes(candidate, attrs)
+        if all(actual == expected for (_, _, expected), actual in zip(resolved_criteria, actual_values)):
+            return True, candidate
+    return True, None
+
+
+def _load_libsystem():
+    """
+    Loads libSystem (which hosts the libproc and sysctl APIs) via ctypes, once.
 
-    # Check if the current element matches all criteria
-    for key, expected_value in criteria.items():
-        attr_name = criteria_map.get(key)
-        if not attr_name:
-            print(f"Warning: Unknown criteria key '{key}'")
-            match = False
-            break # Cannot match an unknown attribute
+    Returns:
+        The ctypes library handle, or None if it could not be loaded.
+    """
+    global _libsystem
+    if _libsystem is None:
+        try:
+            lib = ctypes.CDLL("/usr/lib/libSystem.B.dylib", use_errno=True)
+            lib.proc_listpids.argtypes = [ctypes.c_uint32, ctypes.c_uint32, ctypes.c_void_p, ctypes.c_int]
+            lib.proc_listpids.restype = ctypes.c_int
+            lib.proc_pidpath.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint32]
+            lib.proc_pidpath.restype = ctypes.c_int
+            lib.sysctl.argtypes = [ctypes.POINTER(ctypes.c_int), ctypes.c_uint, ctypes.c_void_p,
+                                   ctypes.POINTER(ctypes.c_size_t), ctypes.c_void_p, ctypes.c_size_t]
+            lib.sysctl.restype = ctypes.c_int
+            _libsystem = lib
+        except (OSError, AttributeError):
+            _libsystem = False # Not on macOS (or symbols missing); use the ps fallback
+    return _libsystem or None
+
+
+def _parse_procargs2(raw):
+    """
+    Parses a KERN_PROCARGS2 buffer into a space-joined command line.
+
+    The buffer holds argc (int32), the executable path, NUL padding, then argv.
+    """
+    argc = int.from_bytes(raw[:4], sys.byteorder)
+    _, _, rest = raw[4:].partition(b"\0") # Skip the executable path
+    argv = rest.lstrip(b"\0").split(b"\0")[:argc]
+    return " ".join(arg.decode("utf-8", "replace") for arg in argv)
+
+
+def _list_processes_libproc(lib):
+    """
+    Reads the process table directly through libproc and sysctl (no fork/exec).
+
+    Args:
+        lib: The libSystem handle from _load_libsystem().
+
+    Returns:
+        A dict mapping PIDs to (executable_path, command_line) tuples.
+    """
+    # Size the PID buffer (with headroom for processes started in between)
+    needed = lib.proc_listpids(PROC_ALL_PIDS, 0, None, 0)
+    if needed <= 0:
+        raise OSError(ctypes.get_errno(), "proc_listpids failed")
+    pid_buf = (ctypes.c_int * (needed // ctypes.sizeof(ctypes.c_int) + 64))()
+    filled = lib.proc_listpids(PROC_ALL_PIDS, 0, pid_buf, ctypes.sizeof(pid_buf))
+    if filled <= 0:
+        raise OSError(ctypes.get_errno(), "proc_listpids failed")
+    pids = sorted(pid for pid in pid_buf[:filled // ctypes.sizeof(ctypes.c_int)] if pid > 0)
+
+    # Maximum size of a process argument block
+    argmax = ctypes.c_int(0)
+    size = ctypes.c_size_t(ctypes.sizeof(argmax))
+    mib = (ctypes.c_int * 2)(CTL_KERN, KERN_ARGMAX)
+    if lib.sysctl(mib, 2, ctypes.byref(argmax), ctypes.byref(size), None, 0) != 0:
+        raise OSError(ctypes.get_errno(), "sysctl(KERN_ARGMAX) failed")
+
+    path_buf = ctypes.create_string_buffer(PROC_PIDPATHINFO_MAXSIZE)
+    args_buf = ctypes.create_string_buffer(argmax.value)
+    processes = {}
+    for pid in pids:
+        length = lib.proc_pidpath(pid, path_buf, PROC_PIDPATHINFO_MAXSIZE)
+        exe_path = path_buf.raw[:length].decode("utf-8", "replace") if length > 0 else ""
+
+        mib = (ctypes.c_int * 3)(CTL_KERN, KERN_PROCARGS2, pid)
+        size = ctypes.c_size_t(argmax.value)
+        if lib.sysctl(mib, 3, args_buf, ctypes.byref(size), None, 0) == 0 and size.value > 4:
+            command = _parse_procargs2(args_buf.raw[:size.value]) or exe_path
+        else:
+            command = exe_path # Arguments of other users' processes are not readable
 
-        actual_value = get_attribute(start_element, attr_name)
-        element_attrs[key] = actual_value # Store for logging
-        verbose_print(args, f"{'  ' * current_depth}   Attr '{key}': Expected='{expected_value}', Actual='{actual_value}'")
+        if exe_path or command:
+            processes[pid] = (exe_path, command)
+    return processes
 
-        # Perform comparison (handle potential type differences if necessary, though usually strings)
-        if actual_value != expected_value:
-            match = False
-            break # Stop checking criteria for this element if one fails
 
-    if match:
-        verbose_print(args, f"{'  ' * current_depth}   🎉 Match found!")
-        return start_element # Found the target element
+def _list_processes_ps():
+    """
+    Fallback process listing via `ps` when libproc is unavailable.
+
+    Returns:
+        A dict mapping PIDs to (executable_path, command_line) tuples.
+    """
+    columns = []
+    for column in ("comm", "command"):
+        # Parse the raw bytes in one pass; lines that don't match are simply skipped
+        result = subprocess.run(["ps", "-axo", f"pid=,{column}="], capture_output=True)
+        columns.append({int(m.group(1)): m.group(2).decode("utf-8", "replace")
+                        for m in _PS_LINE_RE.finditer(result.stdout)})
+    comms, commands = columns
+    return {pid: (comm, commands.get(pid, comm)) for pid, comm in comms.items()}
 
-    verbose_print(args, f"{'  ' * current_depth}   No match at this level. Checking children...")
 
-    # If not matched, search children recursively
-    children = get_attribute(start_element, AX_CHILDREN)
-    if children:
-        verbose_print(args, f"{'  ' * current_depth}   Found {len(children)} children.")
-        for child in children:
-            found_element = find_element_by_criteria(child, criteria, args, current_depth + 1, max_search_depth)
-            if found_element:
-                return found_element # Propagate the found element up the recursion chain
+def iter_processes(ttl=PROCESS_SNAPSHOT_TTL):
+    """
+    Yields every running process from a cached process-table snapshot.
 
-    verbose_print(args, f"{'  ' * current_depth}   No match found in this branch (depth {current_depth}).")
-    return None # Not found in this element or its descendants
+    The table is read through libproc (falling back to `ps`) at most once per
+    `ttl` seconds, so a discovery pass that checks several executables or PIDs
+    only enumerates processes once.
+
+    Args:
+        ttl: Maximum age in seconds of a cached snapshot before it is refreshed.
+
+    Yields:
+        Tuples of (pid, executable_path, command_line), in ascending PID order.
+    """
+    global _process_snapshot
+    now = time.monotonic()
+    # Inside ax_discovery_snapshot() the table is read once and kept regardless of age
+    stale = _process_snapshot is None or (_discovery_windows is None and now - _process_snapshot[0] >= ttl)
+    if stale:
+        lib = _load_libsystem()
+        processes = None
+        if lib:
+            try:
+                processes = _list_processes_libproc(lib)
+            except OSError:
+                processes = None
+        if processes is None:
+            processes = _list_processes_ps()
+        _process_snapshot = (now, processes)
+
+    for pid, (exe_path, command) in _process_snapshot[1].items():
+        yield pid, exe_path, command
 
 
 def find_process_by_cmd(cmd_path, args):
     """
-    Finds a process ID (PID) by its command path using pgrep and ps for verification.
+    Finds a process ID (PID) by its command path using the cached process table.
 
     Args:
         cmd_path: The full path to the executable.
@@ -314,62 +950,38 @@ def find_process_by_cmd(cmd_path, args):
     Returns:
         The integer PID if found and verified, otherwise None.
     """
-    basename = os.path.basename(cmd_path)
-    pid_found = None
+    verbose_print(args, f"   Scanning process table for '{cmd_path}'...")
+    for pid, exe_path, command in iter_processes():
+        # Match the executable itself, or the path within the command line (excluding pgrep)
+        if exe_path == cmd_path or (cmd_path in command and 'pgrep' not in command.lower()):
+            verbose_print(args, f"   Verified PID {pid} for '{cmd_path}'.")
+            return pid # Use the first (lowest) matching PID
+
+    verbose_print(args, f"   No verified PID found for '{cmd_path}' in the process table.")
+    return None
 
-    # 1. Try pgrep with the full command path
-    verbose_print(args, f"   Running: pgrep -f '{cmd_path}'")
-    result_full = subprocess.run(["pgrep", "-f", cmd_path], capture_output=True, text=True)
 
-    potential_pids_full = []
-    if result_full.returncode == 0 and result_full.stdout.strip():
-        potential_pids_full = [line.strip() for line in result_full.stdout.strip().splitlines()]
-        verbose_print(args, f"   pgrep -f found potential PIDs: {potential_pids_full}")
+def prompt_for_index(count, empty_action="cancel"):
+    """
+    Prompts until the user enters a valid list index, or nothing.
 
-    # Verify PIDs found by full path using `ps`
-    for pid_str in potential_pids_full:
-        try:
-            pid = int(pid_str)
-            ps_result = subprocess.run(["ps", "-o", "command=", "-p", str(pid)], capture_output=True, text=True)
-            if ps_result.returncode == 0:
-                ps_command = ps_result.stdout.strip()
-                # Check if the exact cmd_path is in the command AND it's not the pgrep process itself
-                if cmd_path in ps_command and 'pgrep' not in ps_command.lower():
-                    verbose_print(args, f"   Verified PID {pid} via ps for '{cmd_path}'.")
-                    pid_found = pid
-                    break # Found a verified PID, use the first one
-        except (ValueError, subprocess.CalledProcessError):
-            continue # Ignore invalid PIDs or ps errors
-
-    if pid_found:
-        return pid_found
-
-    # 2. If full path failed, try pgrep with just the basename
-    verbose_print(args, f"   Full path search failed or no verified PID. Trying basename: pgrep -fl '{basename}'")
-    result_base = subprocess.run(["pgrep", "-fl", basename], capture_output=True, text=True)
-
-    if result_base.returncode == 0 and result_base.stdout.strip():
-        verbose_print(args, f"   Found potential matches by basename:\n{result_base.stdout.strip()}")
-        for line in result_base.stdout.strip().splitlines():
-            try:
-                pid_str, potential_cmd = line.strip().split(" ", 1)
-                pid = int(pid_str)
-                # Verify this PID using ps and check if the command contains the *original* full cmd_path
-                ps_result = subprocess.run(["ps", "-o", "command=", "-p", str(pid)], capture_output=True, text=True)
-                if ps_result.returncode == 0:
-                     ps_command = ps_result.stdout.strip()
-                     if cmd_path in ps_command and 'pgrep' not in ps_command.lower():
-                         verbose_print(args, f"   Found PID {pid} via basename search, verified full path '{cmd_path}' in ps output: {ps_command}")
-                         pid_found = pid
-                         break # Found a verified PID
-            except (ValueError, subprocess.CalledProcessError):
-                continue # Ignore lines that don't split or ps errors
-
-    if pid_found:
-        return pid_found
-    else:
-        verbose_print(args, f"   No verified PID found for '{cmd_path}' using either full path or basename search.")
-        return None
+    Args:
+        count: Number of selectable items (valid indices are 0 to count-1).
+        empty_action: What pressing Enter does, shown in the prompt (e.g., "cancel").
+
+    Returns:
+        The selected integer index, or None if the input was left empty.
+    """
+    while True:
+        choice = input(f"Select index [0-{count-1}] (or press Enter to {empty_action}): ").strip()
+        if choice == "":
+            return None
+        if not choice.isdecimal(): # Checked up front rather than via int()'s ValueError
+            print("Invalid input. Please enter a number.")
+        elif int(choice) < count:
+            return int(choice)
+        else:
+            print("Invalid index.")
 
 
 def choose_pid_manually(query, args):
@@ -377,24 +989,18 @@ def choose_pid_manually(query, args):
     Allows manual selection of a PID from processes matching a query string.
 
     Args:
-        query: The string to search for in process command lines using pgrep.
+        query: The pattern to search for in process command lines (regex, as with pgrep -f).
         args: Command line arguments (for verbose_print).
 
     Returns:
         The selected integer PID, or None if no processes found or selection cancelled.
     """
-    verbose_print(args, f"   Running: pgrep -fl '{query}'")
-    result = subprocess.run(["pgrep", "-fl", query], capture_output=True, text=True)
-    processes = [] # List of tuples: (pid, cmd)
-    if result.returncode == 0 and result.stdout:
-        for line in result.stdout.strip().splitlines():
-            try:
-                pid_str, cmd = line.strip().split(" ", 1)
-                # Filter out the pgrep command itself to avoid confusion
-                if 'pgrep -fl' not in cmd:
-                    processes.append((int(pid_str), cmd))
-            except ValueError:
-                continue # Ignore lines that don't split correctly
+    verbose_print(args, f"   Matching '{query}' against the process table...")
+    try:
+        query_re = re.compile(query)
+    except re.error:
+        query_re = re.compile(re.escape(query)) # Treat invalid patterns as literal text
+    processes = [(pid, cmd) for pid, _, cmd in iter_processes() if query_re.search(cmd)]
 
     if not processes:
         print(f"❌ No running processes found matching '{query}'.")
@@ -404,25 +1010,78 @@ def choose_pid_manually(query, args):
     for idx, (pid, cmd) in enumerate(processes):
         print(f"[{idx: >2}] PID: {pid: <6} | CMD: {cmd}")
 
-    while True:
-        try:
-            choice = input(f"Select index [0-{len(processes)-1}] (or press Enter to cancel): ").strip()
-            if choice == "":
-                print("   Selection cancelled.")
-                return None
-            idx = int(choice)
-            if 0 <= idx < len(processes):
-                return processes[idx][0] # Return the selected PID
-            else:
-                print("Invalid index.")
-        except ValueError:
-            print("Invalid input. Please enter a number.")
+    idx = prompt_for_index(len(processes))
+    if idx is None:
+        print("   Selection cancelled.")
+        return None
+    return processes[idx][0] # Return the selected PID
+
+
+def _probe_pid_windows(pid, cmd, title_fragment, args):
+    """
+    Lists the AXWindows of one process whose title contains a fragment.
+
+    Args:
+        pid: The process ID to inspect.
+        cmd: The process command name (stored alongside each match).
+        title_fragment: The string to search for in window titles, already lowercased.
+        args: Command line arguments (for verbose_print).
+
+    Returns:
+        A list of tuples: (pid, window_title, command_name, window_element).
+    """
+    matches = []
+    try:
+        verbose_print(args, f"   Checking PID {pid} ({cmd})...")
+        app_element = _app_element_for_pid(pid, store=False) # One-shot sweep; don't flush the cache
+        if not app_element:
+            # Common if process lacks GUI or permissions are insufficient
+            verbose_print(args, f"   Skipping PID {pid}: Could not create AXUIElement.")
+            return matches
+
+        # Direct children that are windows, with their titles
+        windows = _list_windows(app_element)
+        if windows:
+            verbose_print(args, f"   Found {len(windows)} windows for PID {pid}.")
+            for i, title, child_element in windows:
+                # Check the title for the fragment
+                if isinstance(title, str) and title_fragment in title.lower():
+                     verbose_print(args, f"      Match found: Window {i}, Title: '{title}'")
+                     matches.append((pid, title.strip(), cmd, child_element)) # Store the window element
+
+        # else: verbose_print(args, f"   No children found or error getting children for PID {pid}.")
+
+    except Exception as e:
+        # Catch potential errors during AX interaction for a specific PID
+        verbose_print(args, f"   Error processing PID {pid} ({cmd}): {e}")
+    return matches
+
+
+def _may_own_windows(exe_path):
+    """
+    Returns False for executables known not to own windows.
+
+    Args:
+        exe_path: The process's executable path (may be empty if it couldn't be read).
+
+    Returns:
+        True unless the path is in a system daemon/tool location, is an XPC service or
+        bundled helper, or names a known non-GUI executable. Unknown paths are kept.
+    """
+    if not exe_path:
+        return True # Path not readable (e.g. KERN_PROCARGS2 denied); let the AX probe decide
+    if exe_path.startswith(NON_GUI_PATH_PREFIXES) or any(f in exe_path for f in NON_GUI_PATH_FRAGMENTS):
+        return False
+    return os.path.basename(exe_path) not in NON_GUI_EXECUTABLES
 
 
 def search_window_titles_across_apps(title_fragment, args):
     """
     Searches all running applications for AXWindows containing a title fragment.
 
+    Each process is probed on a worker thread: the AX calls are blocking IPC to
+    independent applications (and release the GIL), so they overlap well.
+
     Args:
         title_fragment: The case-insensitive string to search for in window titles.
         args: Command line arguments (for verbose_print).
@@ -431,60 +1090,81 @@ def search_window_titles_across_apps(title_fragment, args):
         A list of tuples: (pid, window_title, command_name, window_element).
         Returns an empty list if no matches found or errors occur.
     """
-    verbose_print(args, "   Getting list of running processes: ps -axo pid=,comm=")
-    result = subprocess.run(["ps", "-axo", "pid=,comm="], capture_output=True, text=True)
+    verbose_print(args, "   Getting list of running processes...")
+    # Skip daemons, shells and helpers that can't own windows; each would cost a failed AX round-trip
+    processes = {pid: exe_path for pid, exe_path, _ in iter_processes()
+                 if _may_own_windows(exe_path)} # {pid: executable path}
     matches = [] # Store (pid, title, cmd, element)
-    processed_pids = set() # Avoid processing the same PID multiple times
 
-    if not result.stdout:
-        verbose_print(args, "   ps command returned no output.")
+    if not processes:
+        verbose_print(args, "   No application processes found in the process table.")
         return matches
+    verbose_print(args, f"   Probing {len(processes)} application processes...")
 
-    for line in result.stdout.strip().splitlines():
-        try:
-            pid_str, cmd = line.strip().split(maxsplit=1)
-            pid = int(pid_str)
-            if pid in processed_pids: continue
-            processed_pids.add(pid)
-
-            verbose_print(args, f"   Checking PID {pid} ({cmd})...")
-            app_element = AXUIElementCreateApplication(pid)
-            if not app_element:
-                # Common if process lacks GUI or permissions are insufficient
-                verbose_print(args, f"   Skipping PID {pid}: Could not create AXUIElement.")
-                continue
-
-            # Get direct children, which often include windows
-            children = get_attribute(app_element, AX_CHILDREN)
-            if children:
-                verbose_print(args, f"   Found {len(children)} potential children for PID {pid}.")
-                for i, child_element in enumerate(children):
-                    # Check if the child is actually a window
-                    role = get_attribute(child_element, AX_ROLE)
-                    if role != AX_WINDOW_ROLE:
-                         # verbose_print(args, f"      Child {i} is not AXWindow (Role: {role}), skipping.")
-                         continue
-
-                    # Get the title and check for the fragment
-                    title = get_attribute(child_element, AX_TITLE)
-                    if isinstance(title, str) and title_fragment.lower() in title.lower():
-                         verbose_print(args, f"      Match found: Window {i}, Title: '{title}'")
-                         matches.append((pid, title.strip(), cmd, child_element)) # Store the window element
-
-            # else: verbose_print(args, f"   No children found or error getting children for PID {pid}.")
-
-        except ValueError:
-            verbose_print(args, f"   Skipping line (format error): {line.strip()}")
-        except Exception as e:
-            # Catch potential errors during AX interaction for a specific PID
-            verbose_print(args, f"   Error processing PID {pid_str} ({cmd}): {e}")
-            continue # Continue to the next process
+    fragment_lower = title_fragment.lower() # Lowercased once, not per window
+    with ThreadPoolExecutor(max_workers=WINDOW_SEARCH_WORKERS) as executor:
+        # map() yields results in PID order, keeping the match list deterministic
+        for pid_matches in executor.map(_probe_pid_windows, processes.keys(), processes.values(),
+                                        repeat(fragment_lower), repeat(args)):
+            matches.extend(pid_matches)
 
     verbose_print(args, f"   Found {len(matches)} total window matches across all PIDs.")
     return matches
 
 
-def find_window_by_title(app_element, title_query, args, match_type="contains"):
+@contextlib.contextmanager
+def ax_discovery_snapshot():
+    """
+    Shares one process-table read and one window listing per app across a discovery pass.
+
+    Inside the block, iter_processes() reuses a single snapshot (taken fresh on
+    entry) and each application's windows are listed only once, however many
+    lookups the selected context performs. Leaving the block drops the cache.
+    """
+    global _discovery_windows, _process_snapshot
+    outer = _discovery_windows
+    if outer is None:
+        _discovery_windows = {}
+        _process_snapshot = None # Start the pass from a fresh process table
+    try:
+        yield
+    finally:
+        _discovery_windows = outer
+
+
+def forget_discovered_windows():
+    """ Drops window listings cached by ax_discovery_snapshot() (e.g., before the user retries). """
+    if _discovery_windows is not None:
+        _discovery_windows.clear()
+
+
+def _list_windows(app_element):
+    """
+    Lists an application's AXWindow children.
+
+    Args:
+        app_element: The AXUIElement of the application.
+
+    Returns:
+        A list of (child_index, title, window_element) tuples; title is the raw
+        AXTitle value (may be None). Memoized inside ax_discovery_snapshot().
+    """
+    if _discovery_windows is not None and app_element in _discovery_windows:
+        return _discovery_windows[app_element]
+
+    windows = []
+    for i, child_element in enumerate(get_attribute(app_element, AX_CHILDREN) or ()):
+        # Role and title come back in one round-trip; keep only windows
+        role, title = get_attributes(child_element, WINDOW_BATCH_ATTRIBUTES)
+        if role == AX_WINDOW_ROLE:
+            windows.append((i, title, child_element))
+
+    if _discovery_windows is not None:
+        _discovery_windows[app_element] = windows
+    return windows
+
+
+def find_window_by_title(app_element, title_query, args, match_type="contains", return_title=False):
     """
     Finds the FIRST AXWindow within a specific app element matching the title query.
 
@@ -493,44 +1173,38 @@ def find_window_by_title(app_element, title_query, args, match_type="contains"):
         title_query: The string to search for in the window title.
         args: Command line arguments (for verbose_print).
         match_type: "contains" (case-insensitive) or "exact" (case-sensitive).
+        return_title: If True, return a (window, title) tuple, reusing the title read
+                      during the search instead of fetching it again.
 
     Returns:
         The first matching AXUIElement (window) found, or None.
+        With return_title, a tuple (window, title), or (None, None) if not found.
     """
-    if not app_element: return None
-
-    children = get_attribute(app_element, AX_CHILDREN)
-    if not children:
-        verbose_print(args, f"   find_window_by_title: No children found for the app element.")
-        return None
-
-    verbose_print(args, f"   find_window_by_title: Searching {len(children)} children for title '{title_query}' (match: {match_type})...")
-    for i, child_element in enumerate(children):
-        # Check if it's a window first
-        role = get_attribute(child_element, AX_ROLE)
-        if role != AX_WINDOW_ROLE:
-             # verbose_print(args, f"      Child {i} is not AXWindow (Role: {role}), skipping.")
-             continue
-
-        # Get title and perform match
-        title = get_attribute(child_element, AX_TITLE)
+    not_found = (None, None) if return_title else None
+    if not app_element: return not_found
+
+    windows = _list_windows(app_element)
+    if not windows:
+        verbose_print(args, f"   find_window_by_title: No windows found for the app element.")
+        return not_found
+
+    verbose_print(args, f"   find_window_by_title: Searching {len(windows)} windows for title '{title_query}' (match: {match_type})...")
+    exact = match_type == "exact"
+    query_lower = title_query.lower() # Lowercased once for "contains" matching
+    for i, title, child_element in windows:
+        # Perform the title match
         if isinstance(title, str):
             title_str = title.strip()
-            matches = False
-            if match_type == "exact":
-                matches = (title_str == title_query)
-            elif match_type == "contains":
-                matches = (title_query.lower() in title_str.lower())
-            else: # Default to contains
-                matches = (title_query.lower() in title_str.lower())
+            # "exact" compares directly; anything else (default) is a case-insensitive contains
+            matches = (title_str == title_query) if exact else (query_lower in title_str.lower())
 
             # verbose_print(args, f"      Checking window {i}: Title='{title_str}', Matches={matches}")
             if matches:
                 verbose_print(args, f"      Found first match: Window {i} with Title '{title_str}'")
-                return child_element # Return the first matching window element
+                return (child_element, title_str) if return_title else child_element # Return the first matching window element
 
     verbose_print(args, f"   find_window_by_title: No matching window found.")
-    return None
+    return not_found
 
 
 def find_all_windows_by_title(app_element, title_query, args, match_type="contains"):
@@ -549,28 +1223,20 @@ def find_all_windows_by_title(app_element, title_query, args, match_type="contai
     matches = [] # Store (title, element) tuples
     if not app_element: return matches
 
-    children = get_attribute(app_element, AX_CHILDREN)
-    if not children:
-        verbose_print(args, f"   find_all_windows_by_title: No children found for the app element.")
+    windows = _list_windows(app_element)
+    if not windows:
+        verbose_print(args, f"   find_all_windows_by_title: No windows found for the app element.")
         return matches
 
-    verbose_print(args, f"   find_all_windows_by_title: Searching {len(children)} children for title '{title_query}' (match: {match_type})...")
-    for i, child_element in enumerate(children):
-        # Check if it's a window first
-        role = get_attribute(child_element, AX_ROLE)
-        if role != AX_WINDOW_ROLE:
-             # verbose_print(args, f"      Child {i} is not AXWindow (Role: {role}), skipping.")
-             continue
-
-        # Get title and perform match
-        title = get_attribute(child_element, AX_TITLE)
+    verbose_print(args, f"   find_all_windows_by_title: Searching {len(windows)} windows for title '{title_query}' (match: {match_type})...")
+    exact = match_type == "exact"
+    query_lower = title_query.lower() # Lowercased once for "contains" matching
+    for i, title, child_element in windows:
+        # Perform the title match
         if isinstance(title, str):
             title_str = title.strip()
-            does_match = False
-            if match_type == "exact":
-                does_match = (title_str == title_query)
-            else: # Default contains
-                does_match = (title_query.lower() in title_str.lower())
+            # "exact" compares directly; anything else (default) is a case-insensitive contains
+            does_match = (title_str == title_query) if exact else (query_lower in title_str.lower())
 
             if does_match:
                 verbose_print(args, f"      Found match: Window {i}, Title: '{title_str}'")
@@ -595,10 +1261,162 @@ def pid_exists(pid):
         return True # Process exists and we have permission to signal it
 
 
+def watch_process_exit(pid):
+    """
+    Registers for a kernel notification when a process exits (kqueue EVFILT_PROC/NOTE_EXIT).
+
+    Args:
+        pid: The process ID to watch.
+
+    Returns:
+        A kqueue object; `kq.control(None, 1, 0)` is non-empty once the process
+        has exited. None if kqueue is unavailable or the PID can't be watched
+        (callers should fall back to pid_exists).
+    """
+    if not hasattr(select, "kqueue"):
+        return None
+    try:
+        kq = select.kqueue()
+        kq.control([select.kevent(pid, filter=select.KQ_FILTER_PROC,
+                                  flags=select.KQ_EV_ADD, fflags=select.KQ_NOTE_EXIT)], 0)
+        return kq
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _app_name_from_path(cmd_path):
+    """
+    Derives (once per path) a user-friendly app name from an executable path.
+
+    Args:
+        cmd_path: The executable path, e.g. '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'.
+
+    Returns:
+        The bundle name without '.app' (e.g. 'Google Chrome'), or the executable's
+        file name if the path is not inside an app bundle.
+    """
+    bundle_path = cmd_path.partition("/Contents/MacOS/")[0]
+    if bundle_path.endswith(".app"):
+        return os.path.basename(bundle_path)[:-len(".app")]
+    return os.path.basename(cmd_path) # Fallback
+
+
+_APP_ELEMENT_CACHE_SIZE = 64
+_app_elements = OrderedDict() # PID -> application AXUIElement, least recently used first
+_app_elements_lock = threading.Lock() # Probes call in from worker threads
+
+
+def _app_element_for_pid(pid, store=True):
+    """
+    Returns the (cached) application AXUIElement for a PID.
+
+    Args:
+        pid: The process ID.
+        store: If False, a new element is not added to the cache (for one-shot
+               probes of many processes, which would otherwise flush it).
+
+    Returns:
+        The application AXUIElement, or None if it could not be created.
+    """
+    with _app_elements_lock:
+        app_element = _app_elements.get(pid)
+        if app_element is not None:
+            _app_elements.move_to_end(pid)
+            return app_element
+    app_element = AXUIElementCreateApplication(pid)
+    if app_element and store: # Failures aren't cached, so the next call tries again
+        with _app_elements_lock:
+            _app_elements[pid] = app_element
+            if len(_app_elements) > _APP_ELEMENT_CACHE_SIZE:
+                _app_elements.popitem(last=False)
+    return app_element
+
+
+def invalidate_pid(pid):
+    """ Drops the cached application element for a PID once it has gone away (PIDs can be reused). """
+    with _app_elements_lock:
+        _app_elements.pop(pid, None)
+
+
+def start_change_observer(pid, app_element, args, is_relevant=None):
+    """
+    Subscribes to accessibility change notifications for an application.
+
+    An AXObserver is attached to a CFRunLoop running on a daemon thread; every
+    notification in CHANGE_NOTIFICATIONS sets the returned event.
+
+    Args:
+        pid: The PID of the application to observe.
+        app_element: The application's AXUIElement (notifications cover all its elements).
+        args: Command line arguments (for verbose_print).
+        is_relevant: Optional callable taking the notifying element; notifications
+                     for which it returns False are ignored.
+
+    Returns:
+        A tuple (changed_event, stop_function), or (None, None) if no
+        notification could be registered (callers should fall back to polling).
+    """
+    changed = threading.Event()
+
+    def on_notification(observer, element, notification, refcon):
+        if is_relevant is None or is_relevant(element):
+            changed.set()
+
+    try:
+        err, observer = AXObserverCreate(pid, on_notification, None)
+        if err != kAXErrorSuccess or observer is None:
+            verbose_print(args, f"   AXObserverCreate failed for PID {pid} (error {err}); polling instead.")
+            return None, None
+        registered = [n for n in CHANGE_NOTIFICATIONS
+                      if AXObserverAddNotification(observer, app_element, n, None) == kAXErrorSuccess]
+    except Exception as e:
+        verbose_print(args, f"   Could not observe PID {pid}: {e}; polling instead.")
+        return None, None
+    if not registered:
+        verbose_print(args, f"   PID {pid} accepted no change notifications; polling instead.")
+        return None, None
+    verbose_print(args, f"   Observing PID {pid} for: {', '.join(registered)}")
+
+    run_loop_ready = threading.Event()
+    run_loop_holder = []
+
+    def run_observer_loop():
+        run_loop = CFRunLoopGetCurrent()
+        CFRunLoopAddSource(run_loop, AXObserverGetRunLoopSource(observer), kCFRunLoopDefaultMode)
+        run_loop_holder.append(run_loop)
+        run_loop_ready.set()
+        CFRunLoopRun()
+
+    threading.Thread(target=run_observer_loop, name=f"ax-observer-{pid}", daemon=True).start()
+    run_loop_ready.wait()
+
+    observer_refs = [observer, on_notification] # Kept alive for as long as the caller holds stop()
+
+    def stop():
+        CFRunLoopStop(run_loop_holder[0])
+        observer_refs.clear()
+
+    return changed, stop
+
+
 # --- Export Function ---
 
 # --- Updated Export Function ---
-def export_to_json(element, base_export_dir, depth, args, serialization_config):
+class _DigestWriter:
+    """Binary file wrapper that hashes everything written through it."""
+    __slots__ = ("file", "digest")
+
+    def __init__(self, file):
+        self.file = file
+        self.digest = hashlib.blake2b()
+
+    def write(self, data):
+        self.digest.update(data)
+        return self.file.write(data)
+
+
+def export_to_json(element, base_export_dir, depth, args, serialization_config, previous_digest=None):
     """
     Serializes the given element and saves it to a timestamped JSON file.
 
@@ -608,6 +1426,11 @@ def export_to_json(element, base_export_dir, depth, args, serialization_config):
         depth: The maximum serialization depth.
         args: Command line arguments (for verbose_print).
         serialization_config: The dictionary for the selected Serialization Preset.
+        previous_digest: Optional digest returned by the previous export; if the new
+                         output is identical, the new file is not kept.
+
+    Returns:
+        The blake2b digest of the exported JSON, or None if nothing was exported.
     """
     if not element:
         print(f"❌ Cannot export, element is None.")
@@ -618,10 +1441,9 @@ def export_to_json(element, base_export_dir, depth, args, serialization_config):
          serialization_config = {}
 
     # Try to get a meaningful name for logging/status
-    element_desc = get_attribute(element, AX_DESCRIPTION) or \
-                   get_attribute(element, AX_TITLE) or \
-                   get_attribute(element, AX_ROLE) or \
-                   "UnknownElement"
+    # One batched read instead of up to three separate lookups
+    element_desc = next((v for v in get_attributes(element, (AX_DESCRIPTION, AX_TITLE, AX_ROLE)) if v),
+                        "UnknownElement")
     print(f"⏳ Serializing element tree starting from '{element_desc}' (max depth: {depth})...")
 
     # Get the list of roles to count from the serialization config
@@ -632,36 +1454,53 @@ def export_to_json(element, base_export_dir, depth, args, serialization_config):
          verbose_print(args, f"   No specific text element roles defined for counting.")
 
 
-    start_time = time.time()
-    # Pass the roles to count to the serialization function
-    serialized_data, text_element_count = serialize_ax_element(
-        element,
-        max_depth=depth,
-        text_roles_to_count=text_roles
-    )
-    end_time = time.time()
-    print(f"⏱️ Serialization finished in {end_time - start_time:.2f} seconds.")
-
-    if not serialized_data:
-        print("❓ Serialization resulted in empty data (possibly due to depth limit or inaccessible elements). Nothing to save.")
-        return
-
     # Generate timestamp and filename
-    timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+    timestamp = time.strftime("%Y-%m-%d-%H-%M-%S")
     filename = f"export_{timestamp}.json"
     filepath = os.path.join(base_export_dir, filename)
 
     try:
         # Ensure the directory exists
         os.makedirs(base_export_dir, exist_ok=True)
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(serialized_data, f, indent=2, ensure_ascii=False)
+        start_time = time.perf_counter()
+        # Nodes are written as they are serialized, so the tree is never held in memory
+        # Written under a temporary name and renamed once complete and known to be new
+        temp_path = filepath + ".tmp"
+        with open(temp_path, "wb", buffering=EXPORT_WRITE_BUFFER) as f:
+            out = _DigestWriter(f) # Hashes the output as it streams, for change detection
+            wrote_data, text_element_count = stream_ax_element(
+                element,
+                out,
+                max_depth=depth,
+                text_roles_to_count=text_roles,
+                prune_roles=serialization_config.get("prune_roles"),
+                attributes=serialization_config.get("serialized_attributes")
+            )
+        end_time = time.perf_counter()
+        print(f"⏱️ Serialization finished in {end_time - start_time:.2f} seconds.")
+
+        if not wrote_data:
+            os.remove(temp_path)
+            print("❓ Serialization resulted in empty data (possibly due to depth limit or inaccessible elements). Nothing to save.")
+            return
+
+        digest = out.digest.digest()
+        if digest == previous_digest:
+            os.remove(temp_path)
+            print("ℹ️ Export unchanged since the previous one. Not saving a duplicate.")
+            return digest
+        os.replace(temp_path, filepath)
+
         # Update the success message to use the new count
         count_desc = f"{text_element_count} relevant text elements found" if text_roles else "Count not applicable"
         print(f"✅ Export saved to: {filepath} ({count_desc})")
+        return digest
     except Exception as e:
         print(f"❌ Error saving JSON file '{filepath}': {e}")
-        verbose_print(args, traceback.format_exc())
+        if args.verbose and not isinstance(e, OSError): # Filesystem errors are fully described by the message
+            traceback.print_exc()
+        if os.path.exists(filepath + ".tmp"):
+            os.remove(filepath + ".tmp") # Don't leave a partial export behind
 
 
 # --- Main Workflow Functions ---
@@ -736,7 +1575,7 @@ def get_initial_element_from_context(context_config, args):
         # --- Common logic block after a PID has been found ---
         if pid:
             print(f"   Creating application element for PID: {pid}...")
-            app_element = AXUIElementCreateApplication(pid)
+            app_element = _app_element_for_pid(pid)
             if not app_element:
                 print(f"❌ Failed to create application element for PID {pid}. Check Accessibility permissions and application state.")
                 return None, None, None
@@ -755,11 +1594,12 @@ def get_initial_element_from_context(context_config, args):
                          title_query_input = input(f"Enter window title fragment (hint: {window_title_hint}, leave empty to cancel): ").strip()
                          if not title_query_input: print("   Window search cancelled."); return None, None, None
                          window_title_query = title_query_input # Store query for messages
-                         current_window_element = find_window_by_title(app_element, window_title_query, args, "contains")
+                         current_window_element, window_title = find_window_by_title(app_element, window_title_query, args, "contains", return_title=True)
                          if current_window_element is None:
                               print(f"❌ Window containing '{window_title_query}' not found in PID {pid}.")
                               try_again = input("Try searching again? (y/N): ").strip().lower()
                               if not try_again.startswith('y'): return None, None, None
+                              forget_discovered_windows() # The window may have been opened since
                          else:
                               window_element = current_window_element # Assign to final variable
                               break # Exit loop, window found
@@ -771,11 +1611,11 @@ def get_initial_element_from_context(context_config, args):
                      window_title_query = window_title_config
                      match_type = "exact" if find_method == "pid_and_exact_window" else "contains"
                      print(f"   Finding window '{window_title_query}' (match: {match_type})...")
-                     window_element = find_window_by_title(app_element, window_title_query, args, match_type)
+                     window_element, window_title = find_window_by_title(app_element, window_title_query, args, match_type, return_title=True)
 
                 # Check result of window finding attempts
                 if window_element:
-                    actual_title = get_attribute(window_element, AX_TITLE) or "Unknown Title"
+                    actual_title = window_title or "Unknown Title"
                     print(f"✅ Found initial window element: '{actual_title}'.")
                     return window_element, app_label, pid # Return the specific WINDOW element
                 else:
@@ -809,33 +1649,45 @@ def get_initial_element_from_context(context_config, args):
         print(f"   Searching for windows containing '{window_title_fragment}' in specific browser processes:")
 
         # --- Find all potentially matching windows across configured browsers ---
+        # PIDs come from the cached process table; the window listings are AX round-trips
+        # to independent browsers, so those run concurrently
+        def probe_browser(pid):
+            """Lists one browser's windows containing the fragment (None if it has no AX element)."""
+            current_app_element = _app_element_for_pid(pid)
+            if not current_app_element:
+                return None
+            verbose_print(args, f"     Searching windows in PID {pid} for '{window_title_fragment}'...")
+            # Find *all* matching windows within this specific browser process
+            return find_all_windows_by_title(current_app_element, window_title_fragment, args, match_type="contains")
+
+        running_browsers = [] # (cmd_path, browser_name, pid) in configured order
         for cmd_path in cmd_paths:
-            try: # Try to derive a user-friendly browser name from the path
-                browser_name = os.path.basename(os.path.dirname(os.path.dirname(cmd_path))).replace('.app', '')
-            except: browser_name = os.path.basename(cmd_path) # Fallback
+            browser_name = _app_name_from_path(cmd_path) # User-friendly browser name
             print(f"   - Checking {browser_name} ('{cmd_path}')...")
 
             pid_found = find_process_by_cmd(cmd_path, args)
             if pid_found:
                 print(f"     Found PID: {pid_found}")
-                current_app_element = AXUIElementCreateApplication(pid_found)
-                if current_app_element:
-                    verbose_print(args, f"     Searching windows in PID {pid_found} for '{window_title_fragment}'...")
-                    # Find *all* matching windows within this specific browser process
-                    found_in_pid = find_all_windows_by_title(current_app_element, window_title_fragment, args, match_type="contains")
-                    for title, win_element in found_in_pid:
-                        matching_windows.append({
-                            "pid": pid_found,
-                            "title": title,
-                            "cmd_path": cmd_path,
-                            "browser_name": browser_name,
-                            "element": win_element # Store the actual window AXUIElement
-                        })
-                    print(f"     Found {len(found_in_pid)} matching window(s) in {browser_name} (PID: {pid_found}).")
-                else:
-                    print(f"     ❌ Could not create application element for PID {pid_found}.")
+                running_browsers.append((cmd_path, browser_name, pid_found))
             else:
                 print(f"     Process not found or running for {browser_name}.")
+
+        with ThreadPoolExecutor(max_workers=max(1, min(WINDOW_SEARCH_WORKERS, len(running_browsers)))) as executor:
+            # map() yields in configured order, so results print in the same order as before
+            window_results = executor.map(probe_browser, [pid for _, _, pid in running_browsers])
+            for (cmd_path, browser_name, pid_found), found_in_pid in zip(running_browsers, window_results):
+                if found_in_pid is None:
+                    print(f"     ❌ Could not create application element for {browser_name} (PID {pid_found}).")
+                    continue
+                for title, win_element in found_in_pid:
+                    matching_windows.append({
+                        "pid": pid_found,
+                        "title": title,
+                        "cmd_path": cmd_path,
+                        "browser_name": browser_name,
+                        "element": win_element # Store the actual window AXUIElement
+                    })
+                print(f"     Found {len(found_in_pid)} matching window(s) in {browser_name} (PID: {pid_found}).")
         # --- End of window finding loop ---
 
         # --- Process the results of the browser search ---
@@ -860,8 +1712,7 @@ def get_initial_element_from_context(context_config, args):
         else: # num_matches > 1
             # --- MODIFIED LOGIC FOR MULTIPLE MATCHES ---
             print(f"\nℹ️ Found multiple ({num_matches}) windows containing '{window_title_fragment}'. Attempting to auto-select the one containing the target element...")
-            for idx, match in enumerate(matching_windows):
-                 print(f"  Candidate [{idx}] PID: {match['pid']:<6} | Browser: {match['browser_name']:<20} | Title: '{match['title']}'")
+            verbose_print(args, f"   {num_matches} candidates in: {[match['browser_name'] for match in matching_windows]}")
 
             # Try to find the target element defined by the default serialization preset
             target_criteria = None
@@ -875,11 +1726,14 @@ def get_initial_element_from_context(context_config, args):
 
             selected_match = None
             if target_criteria:
+                compiled_criteria = compile_criteria(target_criteria) # Resolve once for all candidates
                 # Search within each candidate window for the target criteria
                 for idx, match in enumerate(matching_windows):
                     print(f"   Searching within Candidate [{idx}]: '{match['title']}'...")
-                    # Use find_element_by_criteria to check if this window contains the target
-                    found_target_in_window = find_element_by_criteria(match['element'], target_criteria, args, max_search_depth=15) # Limit depth for speed?
+                    # Ask the AX server to search the window natively; walk the tree only if it can't
+                    supported, found_target_in_window = find_element_by_search_predicate(match['element'], compiled_criteria, args)
+                    if not supported:
+                        found_target_in_window = find_element_by_criteria(match['element'], compiled_criteria, args, max_search_depth=15) # Limit depth for speed?
                     if found_target_in_window:
                         print(f"✅ Found target element ({target_criteria}) within Candidate [{idx}]. Selecting this window.")
                         selected_match = match
@@ -902,36 +1756,46 @@ def get_initial_element_from_context(context_config, args):
                 print(f"✅ Auto-selected window: '{selected_match['title']}' (PID: {pid}) as it contains the target.")
                 return window_element, app_label, pid
             else:
-                while True: # Loop for user selection
-                    try:
-                        choice = input(f"Select index [0-{num_matches-1}] (or press Enter to cancel): ").strip()
-                        if choice == "": print("   Selection cancelled."); return None, None, None
-                        idx = int(choice)
-                        if 0 <= idx < num_matches:
-                            selected_match = matching_windows[idx]
-                            pid = selected_match["pid"]
-                            window_element = selected_match["element"]
-                            app_label = f"{app_label} ({selected_match['browser_name']})" # Refine label
-                            print(f"✅ Selected window: '{selected_match['title']}' (PID: {pid})")
-                            return window_element, app_label, pid # Return selected WINDOW element
-                        else:
-                            print("Invalid index.")
-                    except ValueError:
-                        print("Invalid input. Please enter a number.")
+                # Only list the candidates when the user has to pick one
+                for idx, match in enumerate(matching_windows):
+                     print(f"  Candidate [{idx}] PID: {match['pid']:<6} | Browser: {match['browser_name']:<20} | Title: '{match['title']}'")
+                idx = prompt_for_index(num_matches) # Let the user pick
+                if idx is None: print("   Selection cancelled."); return None, None, None
+                selected_match = matching_windows[idx]
+                pid = selected_match["pid"]
+                window_element = selected_match["element"]
+                app_label = f"{app_label} ({selected_match['browser_name']})" # Refine label
+                print(f"✅ Selected window: '{selected_match['title']}' (PID: {pid})")
+                return window_element, app_label, pid # Return selected WINDOW element
     # --- End of specific_pids_containing_window method ---
 
     # --- Method: Manual search for window title across ALL running apps ---
     elif find_method == "manual_window_search_only":
+         # Previous search, reused briefly while queries only narrow it
+         last_fragment, last_matches, last_search_time = None, [], 0.0
          while True: # Loop for searching with different fragments
              fragment = input("Enter window title fragment to search ALL apps (leave empty to cancel): ").strip()
              if not fragment: print("   Window search cancelled."); return None, None, None
 
-             # search_window_titles_across_apps returns list of (pid, title, cmd, element)
-             matches = search_window_titles_across_apps(fragment, args)
+             fragment_lower = fragment.lower()
+             if (last_matches and last_fragment in fragment_lower
+                     and time.monotonic() - last_search_time <= WINDOW_SEARCH_REUSE_TTL):
+                 # A longer fragment can only match a subset of the previous results; filter them in memory,
+                 # dropping windows whose process has exited since
+                 verbose_print(args, f"   Narrowing the previous {len(last_matches)} matches for '{fragment}'...")
+                 matches = [match for match in last_matches
+                            if fragment_lower in match[1].lower() and pid_exists(match[0])]
+             else:
+                 # search_window_titles_across_apps returns list of (pid, title, cmd, element)
+                 matches = search_window_titles_across_apps(fragment, args)
+                 last_search_time = time.monotonic()
+             last_fragment, last_matches = fragment_lower, matches
              if not matches:
                  print(f"❌ No windows found containing '{fragment}'.")
                  retry_frag = input("Search again with a different fragment? (y/N): ").strip().lower()
                  if not retry_frag.startswith('y'): return None, None, None
+                 forget_discovered_windows() # The window may have been opened since
+                 last_matches = [] # ...so the next search starts fresh
                  continue # Go back to fragment input
 
              # Display matches
@@ -941,28 +1805,23 @@ def get_initial_element_from_context(context_config, args):
                  cmd_name_short = os.path.basename(cmd) if cmd else "UnknownCmd"
                  print(f"[{i: >2}] PID: {mpid: <6} | Title: '{title}' | Cmd: {cmd_name_short}")
 
-             # Loop for selection from the found matches
-             while True:
-                 try:
-                     sel = input(f"Select index [0-{len(matches)-1}] (or press Enter to search again): ").strip()
-                     if sel == "": break # Break inner loop to re-prompt for fragment
-                     idx = int(sel)
-                     if 0 <= idx < len(matches):
-                         pid_sel, title_sel, cmd_name_sel, found_window = matches[idx]
-                         if found_window:
-                             print(f"✅ Selected initial window element: '{title_sel}'.")
-                             # Use command name for a generic label if possible
-                             context_label = os.path.basename(cmd_name_sel).split('.')[0] if '.' in os.path.basename(cmd_name_sel) else os.path.basename(cmd_name_sel)
-                             if not context_label: context_label = app_label # Fallback
-                             return found_window, context_label, pid_sel # Return WINDOW element
-                         else:
-                              # This shouldn't happen if search_window_titles_across_apps worked correctly
-                              print("❌ Internal error: Selected match did not contain a valid window element.")
-                              return None, None, None # Treat as failure
-                     else: print("Invalid index.")
-                 except ValueError: print("Invalid input. Please enter a number.")
+             # Selection from the found matches
+             idx = prompt_for_index(len(matches), "search again")
+             if idx is not None:
+                 pid_sel, title_sel, cmd_name_sel, found_window = matches[idx]
+                 if found_window:
+                     print(f"✅ Selected initial window element: '{title_sel}'.")
+                     # Use command name for a generic label if possible
+                     context_label = os.path.basename(cmd_name_sel).split('.')[0] if '.' in os.path.basename(cmd_name_sel) else os.path.basename(cmd_name_sel)
+                     if not context_label: context_label = app_label # Fallback
+                     return found_window, context_label, pid_sel # Return WINDOW element
+                 else:
+                      # This shouldn't happen if search_window_titles_across_apps worked correctly
+                      print("❌ Internal error: Selected match did not contain a valid window element.")
+                      return None, None, None # Treat as failure
 
-             # If inner loop was broken (Enter pressed), the outer loop continues to ask for fragment
+             # If Enter was pressed, the outer loop continues to ask for fragment
+             # (a longer one within WINDOW_SEARCH_REUSE_TTL narrows these matches)
     # --- End of manual_window_search_only method ---
 
     else:
@@ -994,6 +1853,7 @@ def run_periodic_export(pid, context_config, serialization_config, depth, interv
 
     app_label = context_config.get("app_label", "UnknownLoop")
     target_criteria = serialization_config.get("target_criteria") # e.g., {"role": "AXTable", ...}
+    compiled_criteria = compile_criteria(target_criteria) # Resolved once for every cycle's search
     find_method = context_config.get("find_method")
 
     # Determine if this context requires finding a specific window each cycle
@@ -1007,34 +1867,131 @@ def run_periodic_export(pid, context_config, serialization_config, depth, interv
     window_title_or_fragment = context_config.get("window_title") or context_config.get("window_title_fragment")
     match_type = "exact" if find_method == "pid_and_exact_window" else "contains"
 
+    # Once the target has been found, later cycles only search a little past the
+    # depth it was found at, falling back to a full search if that misses
+    depth_cushion = serialization_config.get("depth_cushion")
+    search_depth_cap = None
+    use_search_predicate = True # Cleared once the app reports the native search unsupported
+
+    def find_target(container_element):
+        nonlocal search_depth_cap, use_search_predicate
+        if use_search_predicate:
+            # Let the AX server do the search in one request when it can
+            supported, found = find_element_by_search_predicate(container_element, compiled_criteria, args)
+            if found:
+                return found
+            use_search_predicate = supported
+        if search_depth_cap is not None:
+            found = find_element_by_criteria(container_element, compiled_criteria, args, max_search_depth=search_depth_cap)
+            if found:
+                return found
+            verbose_print(args, f"   Target not within learned depth {search_depth_cap}; searching full depth.")
+        found, found_depth = find_element_by_criteria(container_element, compiled_criteria, args, return_depth=True)
+        if found and depth_cushion is not None:
+            search_depth_cap = found_depth + depth_cushion
+        return found
+
     verbose_print(args, f"Starting periodic export loop: PID={pid}, Interval={interval}s, TargetCriteria={target_criteria}, NeedsWindowRefind={needs_window_refind}")
 
-    while True:
-        verbose_print(args, f"--- Loop Cycle Start [{datetime.now().strftime('%H:%M:%S')}] ---")
+    # Export on accessibility changes rather than every interval; the interval
+    # stays the minimum spacing and OBSERVER_HEARTBEAT the maximum
+    # Only changes inside the exported element's window count (not e.g. a meeting clock
+    # ticking in another window); elements whose window can't be read always count
+    watched_window = None
+
+    def in_watched_window(element):
+        if watched_window is None:
+            return True
+        window = get_attribute(element, AX_WINDOW)
+        return window is None or window == watched_window
+
+    app_element_current = _app_element_for_pid(pid) # Stable for the PID's lifetime; reused every cycle
+    change_event, stop_observer = start_change_observer(pid, app_element_current, args, in_watched_window)
+    cached_element = None # Element exported last cycle, revalidated instead of re-found
+    last_target_window = None # Candidate window the target was last found in, searched first
+    candidate_misses = [] # [window, cycles left] for candidates recently searched without finding the target
+    consecutive_failures = 0 # Cycles in a row that found nothing to export
+    exit_watch = watch_process_exit(pid) # Kernel exit notification instead of probing each cycle
+    last_digest = None # Digest of the last saved export, so identical ones aren't kept
+
+    # Exports run on a worker thread so the next cycle's search overlaps with
+    # serialization and disk I/O; at most one export runs and one waits behind it
+    # (a newer export replaces a waiting one, since it would supersede it anyway)
+    export_executor = ThreadPoolExecutor(max_workers=1)
+    pending_export = None
+
+    def run_export(element):
+        nonlocal last_digest
+        last_digest = export_to_json(element, base_export_dir, depth, args, serialization_config,
+                                     previous_digest=last_digest) or last_digest
+
+    # Touch the cached element every few seconds between cycles so the target
+    # app's AX server stays warm and the export itself doesn't pay cold latency
+    keep_warm_stop = threading.Event()
+
+    def keep_warm():
+        while not keep_warm_stop.wait(max(1, interval // 6)):
+            try:
+                if cached_element:
+                    get_attribute(cached_element, AX_TITLE)
+            except Exception:
+                pass # Purely best-effort; the export cycle handles real failures
+
+    threading.Thread(target=keep_warm, name=f"ax-keep-warm-{pid}", daemon=True).start()
+
+    # Ctrl+C ends the loop at its next wait rather than raising mid-cycle, so the cleanup
+    # below always runs; a second Ctrl+C interrupts immediately
+    stop_requested = threading.Event()
+    previous_sigint_handler = None
+
+    def request_stop(signum, frame):
+        if stop_requested.is_set():
+            signal.signal(signal.SIGINT, previous_sigint_handler)
+            raise KeyboardInterrupt
+        print("\n🛑 Ctrl+C detected. Stopping export loop (press again to force)...")
+        stop_requested.set()
+        if change_event is not None:
+            change_event.set() # Wake a wait on change notifications
+
+    if threading.current_thread() is threading.main_thread(): # Signal handlers can only be set there
+        previous_sigint_handler = signal.signal(signal.SIGINT, request_stop)
+
+    # Per-cycle log lines are only formatted when verbose (f-strings are built before the call)
+    verbose = args.verbose
+    next_tick = time.monotonic() # Absolute schedule, so cycle work doesn't push exports further apart
+    while not stop_requested.is_set():
+        cycle_time = time.strftime('%H:%M:%S') # Formatted once per cycle
+        if verbose: print(f"--- Loop Cycle Start [{cycle_time}] ---")
         # 1. Check if the target process still exists
-        if not pid_exists(pid):
+        if exit_watch.control(None, 1, 0) if exit_watch else not pid_exists(pid):
+            invalidate_pid(pid)
             print(f"   ⚠️ Process with PID {pid} no longer exists. Stopping export loop.")
             break
 
-        print(f"--- [{datetime.now().strftime('%H:%M:%S')}] Running export cycle for '{app_label}' (PID: {pid}) ---")
+        print(f"--- [{cycle_time}] Running export cycle for '{app_label}' (PID: {pid}) ---")
         element_to_export = None      # Reset element to export each cycle
-        app_element_current = None    # Refreshed app element each cycle
 
         try:
-            # 2. Re-acquire the Application Element using the PID
-            verbose_print(args, f"   Re-creating application element for PID: {pid}...")
-            app_element_current = AXUIElementCreateApplication(pid)
+            # 2. Only re-create the Application Element if creating it failed before
             if not app_element_current:
-                print(f"   ⚠️ Failed to re-create application element for PID {pid}. Skipping cycle.")
-                time.sleep(interval)
-                continue
-            verbose_print(args, "   Application element re-created successfully.")
+                if verbose: print(f"   Re-creating application element for PID: {pid}...")
+                app_element_current = _app_element_for_pid(pid)
+                if not app_element_current:
+                    print(f"   ⚠️ Failed to re-create application element for PID {pid}. Skipping cycle.")
+                    stop_requested.wait(interval)
+                    next_tick = time.monotonic()
+                    continue
+                verbose_print(args, "   Application element re-created successfully.")
 
             # --- Steps 3 & 4 Combined: Determine the specific element to export ---
-            if needs_window_refind:
+            if element_is_valid(cached_element):
+                # The element found in an earlier cycle is still alive; skip the window/target search
+                verbose_print(args, "   Reusing the element found in an earlier cycle.")
+                element_to_export = cached_element
+            elif needs_window_refind:
                 # This context requires finding a specific window first
                 if window_title_or_fragment:
-                    verbose_print(args, f"   Re-finding window(s) matching '{window_title_or_fragment}' (match: {match_type})...")
+                    if verbose: print(f"   Re-finding window(s) matching '{window_title_or_fragment}' (match: {match_type})...")
                     candidate_windows = find_all_windows_by_title(app_element_current, window_title_or_fragment, args, match_type)
 
                     if not candidate_windows:
@@ -1050,9 +2007,9 @@ def run_periodic_export(pid, context_config, serialization_config, depth, interv
                             # Search within this unique window for the target sub-element
                             print(f"   Searching within window for target: {target_criteria}...")
                             start_search_time = time.time()
-                            element_to_export = find_element_by_criteria(win_element, target_criteria, args)
+                            element_to_export = find_target(win_element)
                             end_search_time = time.time()
-                            verbose_print(args, f"   Target search took {end_search_time - start_search_time:.2f} seconds.")
+                            if verbose: print(f"   Target search took {end_search_time - start_search_time:.2f} seconds.")
                             if element_to_export:
                                 print(f"   ✅ Found target sub-element within the window.")
                             else:
@@ -1066,21 +2023,36 @@ def run_periodic_export(pid, context_config, serialization_config, depth, interv
                     else: # Multiple candidate windows found
                         print(f"   ℹ️ Found {len(candidate_windows)} candidate windows matching '{window_title_or_fragment}'.")
                         if target_criteria:
-                            # Search within each candidate for the target criteria
+                            # Search within each candidate for the target criteria, starting with
+                            # the window the target was last found in (usually where it still is)
+                            if last_target_window is not None:
+                                candidate_windows.sort(key=lambda candidate: candidate[1] != last_target_window)
                             print(f"   Searching {len(candidate_windows)} candidates for target: {target_criteria}...")
                             found_target_in_any_candidate = False
+                            # Age out remembered misses; windows still listed are skipped until theirs expire,
+                            # unless that would skip every candidate (backoff already spaces out those searches)
+                            candidate_misses = [[window, cycles - 1] for window, cycles in candidate_misses if cycles > 1]
+                            recently_missed = [any(window == win_element for window, _ in candidate_misses)
+                                               for _, win_element in candidate_windows]
+                            if all(recently_missed):
+                                recently_missed = [False] * len(candidate_windows)
                             for idx, (win_title, win_element) in enumerate(candidate_windows):
-                                verbose_print(args, f"      Searching Candidate [{idx}]: '{win_title}'...")
+                                if recently_missed[idx]:
+                                    if verbose: print(f"      Skipping Candidate [{idx}]: '{win_title}' (no target there recently).")
+                                    continue
+                                if verbose: print(f"      Searching Candidate [{idx}]: '{win_title}'...")
                                 start_search_time = time.time()
                                 # Check if this candidate contains the target
-                                found_target = find_element_by_criteria(win_element, target_criteria, args)
+                                found_target = find_target(win_element)
                                 end_search_time = time.time()
-                                verbose_print(args, f"      Search in candidate [{idx}] took {end_search_time - start_search_time:.2f} seconds.")
+                                if verbose: print(f"      Search in candidate [{idx}] took {end_search_time - start_search_time:.2f} seconds.")
                                 if found_target:
                                     print(f"   ✅ Found target element in Candidate [{idx}]: '{win_title}'. Using this for export.")
                                     element_to_export = found_target # Export the target element found
+                                    last_target_window = win_element
                                     found_target_in_any_candidate = True
                                     break # Stop searching once found in the first candidate
+                                candidate_misses.append([win_element, CANDIDATE_MISS_CYCLES])
                             if not found_target_in_any_candidate:
                                 print(f"   ⚠️ Target element ({target_criteria}) not found in any of the {len(candidate_windows)} candidate windows.")
                                 element_to_export = None # Ensure it's None if not found
@@ -1100,9 +2072,9 @@ def run_periodic_export(pid, context_config, serialization_config, depth, interv
                      # Search within the main app element
                      print(f"   Searching within application element for target: {target_criteria}...")
                      start_search_time = time.time()
-                     element_to_export = find_element_by_criteria(container_element, target_criteria, args)
+                     element_to_export = find_target(container_element)
                      end_search_time = time.time()
-                     verbose_print(args, f"   Target search took {end_search_time - start_search_time:.2f} seconds.")
+                     if verbose: print(f"   Target search took {end_search_time - start_search_time:.2f} seconds.")
                      if element_to_export:
                           print(f"   ✅ Found target sub-element within the application element.")
                      else:
@@ -1114,23 +2086,58 @@ def run_periodic_export(pid, context_config, serialization_config, depth, interv
                      element_to_export = container_element
 
             # --- Step 5: Perform the Export ---
+            if element_to_export is not cached_element:
+                watched_window = get_attribute(element_to_export, AX_WINDOW) if element_to_export else None
+            cached_element = element_to_export # Reused next cycle while it stays valid
             if element_to_export:
-                 export_to_json(element_to_export, base_export_dir, depth, args, serialization_config)
+                 if pending_export and pending_export.cancel(): # Only succeeds if it hasn't started
+                     verbose_print(args, "   Dropped a queued export superseded by this cycle's.")
+                 pending_export = export_executor.submit(run_export, element_to_export)
             else:
                  # This occurs if no matching window/app was found, or if target_criteria were specified but not met
                  print("   Skipping export this cycle (required element not found or identified).")
 
         except Exception as e:
             print(f"⚠️ An unexpected error occurred during the export cycle: {e}")
-            if args.verbose: # Print traceback only if verbose
+            if args.verbose and not isinstance(e, OSError): # Traceback only if verbose, and not for routine I/O failures
                  traceback.print_exc()
             # Allow the loop to continue to the next interval
 
         # --- Step 6: Wait for the next interval ---
-        print(f"--- Waiting {interval} seconds ---")
-        time.sleep(interval)
+        if not element_to_export:
+            # Nothing to export (window closed, app minimized, ...): back off exponentially
+            backoff = max(interval, min(interval * 2 ** consecutive_failures, MAX_RETRY_BACKOFF))
+            consecutive_failures += 1
+            print(f"--- Waiting {backoff} seconds (attempt {consecutive_failures} without a target) ---")
+            stop_requested.wait(backoff)
+            next_tick = time.monotonic()
+        else:
+            consecutive_failures = 0
+            # Sleep until the next scheduled tick rather than a full interval after the work finished
+            next_tick += interval
+            sleep_for = max(0, next_tick - time.monotonic())
+            if sleep_for == 0:
+                print(f"   ⚠️ Export cycle took longer than the {interval}s interval; skipping ahead.")
+                next_tick = time.monotonic()
+            if change_event is None:
+                print(f"--- Waiting {sleep_for:.1f} seconds ---")
+                stop_requested.wait(sleep_for)
+            else:
+                print(f"--- Waiting for changes (next export in {sleep_for:.1f}-{sleep_for + max(0, OBSERVER_HEARTBEAT - interval):.1f} seconds) ---")
+                if not stop_requested.wait(sleep_for) and not change_event.wait(max(0, OBSERVER_HEARTBEAT - interval)):
+                    verbose_print(args, "   No change notifications; exporting on heartbeat.")
+                change_event.clear()
+                next_tick = time.monotonic() # Realign after waiting on notifications
         # --- End of Loop Cycle ---
 
+    export_executor.shutdown(wait=True) # Let an in-flight export finish
+    if previous_sigint_handler is not None:
+        signal.signal(signal.SIGINT, previous_sigint_handler)
+    keep_warm_stop.set()
+    if exit_watch:
+        exit_watch.close()
+    if stop_observer:
+        stop_observer()
     verbose_print(args, "Exited periodic export loop.")
 
 
@@ -1170,7 +2177,7 @@ def main():
         print("--- Verbose Mode Enabled ---")
 
     # --- Accessibility Permissions Check ---
-    if not AXIsProcessTrusted():
+    if not is_accessibility_trusted():
         print("\n" + "="*60)
         print(" Accessibility Permissions Required ".center(60, "="))
         print("\nThis script requires Accessibility permissions to inspect UI elements.")
@@ -1192,38 +2199,7 @@ def main():
     # --- Stage 1: Select App Context & Find Initial Element ---
     while initial_element is None: # Loop until an element is found or user quits
         print("\n--- Stage 1: Select Application Context ---")
-
-        # Separate contexts into presets and manual for display
-        preset_keys = []
-        manual_keys = []
-        for key, config in APP_CONTEXTS.items():
-            find_method = config.get("find_method", "")
-            if find_method.startswith("manual_"):
-                manual_keys.append(key)
-            else:
-                preset_keys.append(key)
-
-        # Build the ordered list for selection and display menu
-        all_options_keys = [] # Stores the keys in the order they are presented
-        current_index = 0
-
-        print("--- Presets ---")
-        if preset_keys:
-            for key in sorted(preset_keys): # Sort for consistent display order
-                print(f"  [{current_index}] {key}")
-                all_options_keys.append(key)
-                current_index += 1
-        else:
-            print("  (No presets defined)")
-
-        print("\n--- Manual Options ---")
-        if manual_keys:
-            for key in sorted(manual_keys): # Sort for consistent display order
-                print(f"  [{current_index}] {key}")
-                all_options_keys.append(key)
-                current_index += 1
-        else:
-             print("  (No manual options defined)")
+        print(_CONTEXT_MENU)
 
         print("--------------------")
         print("  [q] Quit")
@@ -1235,14 +2211,16 @@ def main():
 
         try:
             chosen_index = int(choice)
-            if 0 <= chosen_index < len(all_options_keys):
-                chosen_context_name = all_options_keys[chosen_index]
+            if 0 <= chosen_index < len(_CONTEXT_INDEX):
+                chosen_context_name = _CONTEXT_INDEX[chosen_index]
                 # Get a fresh copy of the config to avoid modifications affecting subsequent runs
-                context_config = copy.deepcopy(APP_CONTEXTS[chosen_context_name])
+                # (only the top-level 'app_label' is ever reassigned, so a shallow copy suffices)
+                context_config = dict(APP_CONTEXTS[chosen_context_name])
                 print(f"\nSelected Context: {chosen_context_name}. Attempting to find element...")
 
                 # This function attempts to find the element based on the config
-                initial_element, refined_app_label, pid = get_initial_element_from_context(context_config, args)
+                with ax_discovery_snapshot(): # One process/window listing for the whole discovery pass
+                    initial_element, refined_app_label, pid = get_initial_element_from_context(context_config, args)
 
                 if initial_element is None:
                      print("❌ Failed to find the initial App/Window element for this context, or operation cancelled.")
@@ -1278,7 +2256,7 @@ def main():
     # Try to use the default preset if specified and valid
     if default_preset_name and default_preset_name in SERIALIZATION_PRESETS:
         serialization_name = default_preset_name
-        selected_serialization_config = copy.deepcopy(SERIALIZATION_PRESETS[serialization_name])
+        selected_serialization_config = dict(SERIALIZATION_PRESETS[serialization_name])
         print("\n--- Stage 2: Serialization Target ---")
         print(f"✅ Automatically selected serialization based on context: {serialization_name}")
         verbose_print(args, f"Using default serialization preset: {serialization_name}")
@@ -1301,7 +2279,7 @@ def main():
                 chosen_index = int(choice)
                 if 0 <= chosen_index < len(serialization_keys):
                     serialization_name = serialization_keys[chosen_index]
-                    selected_serialization_config = copy.deepcopy(SERIALIZATION_PRESETS[serialization_name])
+                    selected_serialization_config = dict(SERIALIZATION_PRESETS[serialization_name])
                     print(f"\nSelected Serialization: {serialization_name}")
                     verbose_print(args, f"User selected serialization preset: {serialization_name}")
                     break # Exit selection loop
@@ -1362,7 +2340,7 @@ def main():
 
 
     # --- Stage 4: Create Base Directory and Execute Export ---
-    parent_timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+    parent_timestamp = time.strftime("%Y-%m-%d-%H-%M-%S")
     # Create a filesystem-safe name from the (potentially refined) app label
     base_export_dir = os.path.join(BASE_EXPORT_DIR_NAME, f"export_{parent_timestamp}")
 
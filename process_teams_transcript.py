@@ -4,7 +4,21 @@ import os
 import re
 import datetime
 import glob
-from difflib import SequenceMatcher
+import io
+import hashlib
+import pickle
+import functools # For caching speaker name cleanup
+from concurrent.futures import ProcessPoolExecutor # For parsing files in parallel
+from itertools import chain, groupby
+from operator import itemgetter
+try:
+    import orjson # Optional: much faster JSON decoding for large exports
+except ImportError:
+    orjson = None
+try:
+    import ijson # Optional: streams large exports instead of loading the whole tree
+except ImportError:
+    ijson = None
 
 # --- Configuration ---
 OUTPUT_BASE_DIR = "processed_transcripts"
@@ -16,125 +30,145 @@ OVERLAP_LOOKBACK_PREVIOUS = 30
 MIN_OVERLAP_LENGTH = 3
 # Set to True for detailed print statements during overlap detection and node finding
 DEBUG_MODE = False # Combined debug flag
+# Extracted (speaker, text) parts are cached here, one entry per input file (validated by mtime and size)
+# so re-processing an unchanged export skips JSON parsing. Bump the version when extraction changes.
+PARTS_CACHE_DIR = os.path.join(OUTPUT_BASE_DIR, "_parts_cache")
+PARTS_CACHE_VERSION = 2
+# Files at least this large are stream-parsed with ijson (when installed), stopping once the
+# Live Captions group has been read; smaller files are faster to json.load in one go.
+STREAM_PARSE_MIN_BYTES = 256 * 1024
+# Directories with at least this many files are parsed in worker processes (results are still
+# stitched in chronological order); files are handed to each worker this many at a time.
+PARALLEL_PARSE_MIN_FILES = 8
+PARALLEL_PARSE_CHUNKSIZE = 4
+# Upper bound on worker processes; each one pays interpreter start-up before parsing anything
+PARALLEL_PARSE_MAX_WORKERS = 8
+
+# Trailing speaker indicators like '(Guest)', '(Unverified)', compiled once for every caption
+SPEAKER_SUFFIX_PATTERN = re.compile(r'\s*\(.*\)\s*$')
+# Export timestamp in filenames (YYYY-MM-DD-HH-MM-SS), one group per datetime field
+FILENAME_TIMESTAMP_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})-(\d{2})-(\d{2})-(\d{2})")
 
 # --- Core Processing Functions ---
 
 def find_live_captions_group(node):
     """
-    Recursively searches the JSON data structure for the specific AXGroup
-    node that contains the live captions.
+    Searches the JSON data structure (depth-first, in document order) for the
+    specific AXGroup node that contains the live captions.
 
     Args:
-        node: The current node (dict or list) in the JSON structure.
+        node: The root node (dict or list) of the JSON structure.
 
     Returns:
         dict | None: The dictionary representing the "Live Captions" AXGroup
                      if found, otherwise None.
     """
-    if isinstance(node, dict):
-        # Check if this node is the target "Live Captions" group
-        if (node.get("role") == "AXGroup" and
-            node.get("description") == "Live Captions"):
-            if DEBUG_MODE: print("  Found 'Live Captions' AXGroup.")
-            return node
-
-        # If not the target, search its children recursively
-        if "children" in node:
-            for child in node.get("children", []):
-                found_node = find_live_captions_group(child)
-                if found_node:
-                    return found_node # Return immediately if found in a child
-
-    elif isinstance(node, list):
-        # If it's a list, search each item in the list
-        for item in node:
-            found_node = find_live_captions_group(item)
-            if found_node:
-                return found_node # Return immediately if found in an item
-
-    return None # Target node not found in this branch
+    # Explicit stack instead of recursion: avoids a call frame per node and the
+    # recursion limit on deep UI trees. Children are pushed reversed so they pop in order.
+    stack = [node]
+    pop, extend = stack.pop, stack.extend
+    while stack:
+        node = pop()
+        if isinstance(node, dict):
+            # Check if this node is the target "Live Captions" group
+            if (node.get("role") == "AXGroup" and
+                node.get("description") == "Live Captions"):
+                if DEBUG_MODE: print("  Found 'Live Captions' AXGroup.")
+                return node
+
+            # If not the target, search its children
+            children = node.get("children")
+            if children:
+                extend(reversed(children))
+
+        elif isinstance(node, list):
+            # If it's a list, search each item in the list
+            extend(reversed(node))
+
+    return None # Target node not found
+
+
+@functools.lru_cache(maxsize=1024) # A handful of speakers repeat across every caption
+def _clean_speaker_name(speaker):
+    """
+    Cleans a raw speaker name from a caption (once per distinct name).
+
+    Args:
+        speaker (str): The speaker name as shown in Teams.
+
+    Returns:
+        str: The interned name without trailing indicators like '(Guest)' or
+             '(Unverified)', or "Unknown Speaker" if nothing is left.
+    """
+    processed_speaker = SPEAKER_SUFFIX_PATTERN.sub('', speaker).strip()
+    if not processed_speaker: processed_speaker = "Unknown Speaker" # Handle empty speaker after cleaning
+    return sys.intern(processed_speaker)
 
 
 def _extract_speaker_text_pairs(node):
     """
-    Recursively searches a specific subtree (expected to be the children
-    of the 'Live Captions' group) for transcript parts (speaker and text).
-    Normalizes whitespace in the extracted text.
+    Searches a specific subtree (expected to be the children of the
+    'Live Captions' group) for transcript parts (speaker and text), in
+    document order. Normalizes whitespace in the extracted text.
 
     Args:
-        node: The current node (dict or list) within the Live Captions subtree.
+        node: The root node (dict or list) of the Live Captions subtree.
 
     Returns:
         list: A list of (speaker, text) tuples found under this node.
     """
     parts = []
-    if isinstance(node, dict):
-        # Specific structure indicating a speaker and their text in Teams JSON
-        # This structure appears *within* the Live Captions group's children
-        # Example Path within Live Captions: AXGroup -> AXList -> AXGroup -> AXGroup(speaker)/AXStaticText(text)
-        if (node.get("role") == "AXGroup" and
-                len(node.get("children", [])) == 2):
-            child1 = node["children"][0]
-            child2 = node["children"][1]
-
-            is_speaker_group = (
-                isinstance(child1, dict) and
-                child1.get("role") == "AXGroup" and
-                len(child1.get("children", [])) == 1 and # Contains the speaker text
-                isinstance(child1["children"][0], dict) and
-                child1["children"][0].get("role") == "AXStaticText" and
-                "value" in child1["children"][0]
-            )
-            # Sometimes the speaker name AXStaticText might be nested deeper
-            # Let's add a helper function to find the first AXStaticText value
-            def find_first_static_text(sub_node):
-                 if isinstance(sub_node, dict):
-                    if sub_node.get("role") == "AXStaticText" and "value" in sub_node:
-                        return sub_node["value"]
-                    if "children" in sub_node:
-                        for sub_child in sub_node.get("children", []):
-                             found = find_first_static_text(sub_child)
-                             if found is not None: return found
-                 elif isinstance(sub_node, list):
-                     for item in sub_node:
-                        found = find_first_static_text(item)
-                        if found is not None: return found
-                 return None
-
-            is_text_element = (
-                isinstance(child2, dict) and
-                child2.get("role") == "AXStaticText" and
-                "value" in child2
-            )
-
-            if is_speaker_group and is_text_element:
-                speaker_text_node = child1["children"][0]
-                # Use the helper to be robust to nesting variations for speaker
-                speaker = find_first_static_text(speaker_text_node)
-                if speaker is None: # Fallback if helper fails (shouldn't usually)
-                    speaker = speaker_text_node.get("value", "Unknown Speaker")
-
-                text = child2["value"]
-                text = ' '.join(text.split()) # Normalize whitespace
-
-                if text: # Only add if text is not empty after normalization
-                    # Clean speaker name (remove potential trailing indicators like '(Guest)', '(Unverified)')
-                    processed_speaker = re.sub(r'\s*\(.*\)\s*$', '', speaker).strip()
-                    if not processed_speaker: processed_speaker = "Unknown Speaker" # Handle empty speaker after cleaning
-                    parts.append((processed_speaker, text))
-                    if DEBUG_MODE: print(f"    Extracted: [{processed_speaker}] {text}")
-                # Stop searching deeper within this matched structure
-                return parts # Return immediately once a pair is found at this level
-
-        # Recursively search children if not the target structure *or* if it's a container like AXList
-        if "children" in node:
-            for child in node.get("children", []):
-                parts.extend(_extract_speaker_text_pairs(child))
-
-    elif isinstance(node, list):
-        # Recursively search items in a list
-        for item in node:
-            parts.extend(_extract_speaker_text_pairs(item))
+    append = parts.append
+    debug = DEBUG_MODE # Read the flag once rather than per extracted caption
+    # Explicit stack instead of recursion (see find_live_captions_group)
+    stack = [node]
+    pop, extend = stack.pop, stack.extend
+    while stack:
+        node = pop()
+        if isinstance(node, dict):
+            children = node.get("children", [])
+            # Specific structure indicating a speaker and their text in Teams JSON
+            # This structure appears *within* the Live Captions group's children
+            # Example Path within Live Captions: AXGroup -> AXList -> AXGroup -> AXGroup(speaker)/AXStaticText(text)
+            if (node.get("role") == "AXGroup" and
+                    len(children) == 2):
+                child1, child2 = children
+
+                # Checked first: it is the cheapest test and rules out most other two-child groups
+                is_text_element = (
+                    isinstance(child2, dict) and
+                    child2.get("role") == "AXStaticText" and
+                    "value" in child2
+                )
+
+                speaker_node = None
+                if is_text_element and isinstance(child1, dict) and child1.get("role") == "AXGroup":
+                    speaker_children = child1.get("children", [])
+                    if len(speaker_children) == 1: # Contains the speaker text
+                        speaker_node = speaker_children[0]
+
+                if (isinstance(speaker_node, dict) and
+                        speaker_node.get("role") == "AXStaticText" and
+                        "value" in speaker_node):
+                    speaker = speaker_node["value"]
+
+                    text = child2["value"]
+                    text = ' '.join(text.split()) # Normalize whitespace
+
+                    if text: # Only add if text is not empty after normalization
+                        processed_speaker = _clean_speaker_name(speaker)
+                        append((processed_speaker, text))
+                        if debug: print(f"    Extracted: [{processed_speaker}] {text}")
+                    # Stop searching deeper within this matched structure
+                    continue
+
+            # Search children if not the target structure *or* if it's a container like AXList
+            if children:
+                extend(reversed(children))
+
+        elif isinstance(node, list):
+            # Search items in a list
+            extend(reversed(node))
 
     return parts
 
@@ -162,6 +196,162 @@ def find_transcript_parts_teams_robust(root_node):
         if DEBUG_MODE: print("  'Live Captions' AXGroup not found in this file.")
         return []
 
+def _stream_live_captions_children(file_path):
+    """
+    Stream-parses a Teams JSON file with ijson and materializes only the
+    children of the first 'Live Captions' AXGroup (the same node
+    find_live_captions_group would return), stopping there.
+
+    Relies on the exporter writing a node's attributes before its "children";
+    if a matching group turns out to have them in another order, or the
+    stream cannot be parsed, the caller should fall back to json.load.
+
+    Args:
+        file_path (str): Path to the Teams JSON file.
+
+    Returns:
+        tuple | None: (found, children) where found is False if the file has no
+                      'Live Captions' group, or None to request a full json.load.
+    """
+    # One entry per open container, mirroring which nodes the recursive search would visit:
+    # maps are [reachable, role, description, current_key]; arrays are [reachable].
+    containers = []
+    value_key = None # Key whose value is the next event (None inside arrays / at the top level)
+    try:
+        with open(file_path, "rb") as f:
+            events = ijson.parse(f, use_float=True)
+            for _, event, value in events:
+                key, value_key = value_key, None
+                parent = containers[-1] if containers else None
+                if event == "map_key":
+                    parent[3] = value_key = value
+                    if value == "children" and parent[0] and parent[1] == "AXGroup" and parent[2] == "Live Captions":
+                        if DEBUG_MODE: print("  Found 'Live Captions' AXGroup.")
+                        # Build just this group's children from the stream, then stop reading
+                        builder = ijson.ObjectBuilder()
+                        depth = 0
+                        for _, event, value in events:
+                            builder.event(event, value)
+                            if event in ("start_map", "start_array"):
+                                depth += 1
+                            elif event in ("end_map", "end_array"):
+                                depth -= 1
+                            if depth == 0:
+                                return True, builder.value
+                elif event == "start_map":
+                    # Dicts are only searched at the top level or as list items
+                    reachable = parent is None or (len(parent) == 1 and parent[0])
+                    containers.append([reachable, None, None, None])
+                elif event == "start_array":
+                    # Lists are searched at the top level, as list items, or as a dict's "children"
+                    reachable = parent is None or parent[0] and (len(parent) == 1 or key == "children")
+                    containers.append([reachable])
+                elif event in ("end_map", "end_array"):
+                    node = containers.pop()
+                    if event == "end_map" and node[0] and node[1] == "AXGroup" and node[2] == "Live Captions":
+                        return None # Matched only after its children were skipped; needs the full tree
+                elif key in ("role", "description") and event == "string":
+                    parent[1 if key == "role" else 2] = value
+    except ijson.JSONError as e:
+        if DEBUG_MODE: print(f"  Streaming parse failed ({e}); falling back to json.load.")
+        return None
+    return False, None
+
+
+def _load_json(file_path):
+    """
+    Decodes a JSON file, with orjson when available.
+
+    Args:
+        file_path (str): Path to the JSON file.
+
+    Returns:
+        The decoded JSON value (dicts and lists, as json.load returns).
+
+    Raises:
+        json.JSONDecodeError, OSError: If the file cannot be read or parsed.
+    """
+    with open(file_path, "rb") as f:
+        raw = f.read()
+    if orjson:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass # Let the stdlib decoder accept what orjson rejects (e.g. NaN) or report the error
+    return json.loads(raw)
+
+
+def load_transcript_parts(file_path):
+    """
+    Returns the (speaker, text) parts for a Teams JSON file, using the on-disk
+    parts cache when the file is unchanged since it was last extracted.
+
+    Args:
+        file_path (str): Path to the Teams JSON file.
+
+    Returns:
+        list: A list of (speaker, text) tuples (see find_transcript_parts_teams_robust).
+
+    Raises:
+        json.JSONDecodeError, OSError: If the file cannot be read or parsed.
+    """
+    stat = os.stat(file_path)
+    # One entry per source file, holding the version it was extracted from, so a changed
+    # file overwrites its entry instead of adding another
+    cache_key = f"{PARTS_CACHE_VERSION}|{os.path.abspath(file_path)}"
+    cache_path = os.path.join(PARTS_CACHE_DIR, hashlib.sha1(cache_key.encode("utf-8")).hexdigest() + ".pickle")
+    file_version = (stat.st_mtime_ns, stat.st_size)
+
+    try:
+        with open(cache_path, "rb") as f:
+            cached_version, parts = pickle.load(f)
+        if cached_version == file_version:
+            if DEBUG_MODE: print(f"  Loaded {len(parts)} parts from cache.")
+            return parts
+    except FileNotFoundError:
+        pass
+    except Exception as e: # Corrupt or unreadable cache entry; re-extract below
+        if DEBUG_MODE: print(f"  Ignoring unreadable cache entry {cache_path}: {e}")
+
+    streamed = None
+    if ijson and stat.st_size >= STREAM_PARSE_MIN_BYTES:
+        streamed = _stream_live_captions_children(file_path)
+    if streamed is not None:
+        found, children = streamed
+        parts = _extract_speaker_text_pairs(children) if found else []
+        if DEBUG_MODE and not found: print("  'Live Captions' AXGroup not found in this file.")
+    else:
+        parts = find_transcript_parts_teams_robust(_load_json(file_path))
+
+    # Write via a temp file so an interrupted run never leaves a truncated entry behind
+    try:
+        os.makedirs(PARTS_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((file_version, parts), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        if DEBUG_MODE: print(f"  Could not write cache entry {cache_path}: {e}")
+    return parts
+
+def _load_transcript_parts_safely(file_path):
+    """
+    Runs load_transcript_parts, returning errors instead of raising so a bad
+    file doesn't abort the other files being parsed alongside it.
+
+    Args:
+        file_path (str): Path to the Teams JSON file.
+
+    Returns:
+        tuple: (parts, None) on success, or (None, (is_decode_error, message)).
+    """
+    try:
+        return load_transcript_parts(file_path), None
+    except json.JSONDecodeError as e:
+        return None, (True, str(e))
+    except Exception as e:
+        return None, (False, str(e))
+
 # --- Timestamp and Overlap Functions (Unchanged) ---
 
 def get_timestamp_from_filename(filename):
@@ -177,13 +367,13 @@ def get_timestamp_from_filename(filename):
                                   or not parsable.
     """
     # Regex to find the timestamp pattern
-    match = re.search(r"(\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2})", filename)
+    match = FILENAME_TIMESTAMP_PATTERN.search(filename)
     if match:
         try:
-            ts_str = match.group(1)
-            return datetime.datetime.strptime(ts_str, "%Y-%m-%d-%H-%M-%S")
+            # Build the datetime from the captured fields directly; strptime is far slower per call
+            return datetime.datetime(*map(int, match.groups()))
         except ValueError:
-            if DEBUG_MODE: print(f"Warning: Could not parse timestamp from '{ts_str}' in {filename}")
+            if DEBUG_MODE: print(f"Warning: Could not parse timestamp from '{match.group(0)}' in {filename}")
             return None
     if DEBUG_MODE: print(f"Warning: Could not find timestamp pattern in filename {filename}")
     return None
@@ -191,9 +381,13 @@ def get_timestamp_from_filename(filename):
 def find_best_overlap_index(previous_parts, current_parts, lookback_prev, min_len):
     """
     Finds the best overlap between the end of previous_parts and the start
-    of current_parts using SequenceMatcher to find the longest common subsequence.
+    of current_parts by finding the longest common run of (speaker, text) tuples.
     This is more robust to minor variations than exact matching.
 
+    Equivalent to difflib.SequenceMatcher(None, prev, curr, autojunk=False)
+    .find_longest_match(), including its tie-breaking (earliest in previous,
+    then earliest in current), without building a matcher for every file.
+
     Args:
         previous_parts (list): List of (speaker, text) tuples from previous files.
         current_parts (list): List of (speaker, text) tuples from the current file.
@@ -219,36 +413,88 @@ def find_best_overlap_index(previous_parts, current_parts, lookback_prev, min_le
     if not prev_slice or not curr_slice:
          return 0 # One of the slices is empty
 
-    # Use SequenceMatcher to find the longest block of matching (speaker, text) tuples
-    matcher = SequenceMatcher(None, prev_slice, curr_slice, autojunk=False)
-    # Find the longest matching block within the specified ranges
-    match = matcher.find_longest_match(0, len(prev_slice), 0, len(curr_slice))
+    # Fast path: consecutive snapshots usually repeat the whole lookback window contiguously.
+    # No common run can be longer than prev_slice, and the earliest such position is the one
+    # the full scan below would pick, so the result is identical.
+    len_slice = len(prev_slice)
+    if len_slice >= min_len:
+        anchor = prev_slice[0]
+        last_start = len_curr - len_slice # Last index where a full-window match can still start
+        j = 0
+        while j <= last_start:
+            try:
+                j = curr_slice.index(anchor, j, last_start + 1) # C-level scan for the next anchor
+            except ValueError:
+                break
+            if curr_slice[j:j + len_slice] == prev_slice:
+                if DEBUG_MODE: print(f"\n  Overlap Check: whole lookback window ({len_slice}) found at index {j}. New content starts at index {j + len_slice} in current_parts.")
+                return j + len_slice
+            j += 1
+
+    # Index where each (speaker, text) tuple occurs in the current parts (hashed once per tuple)
+    positions_in_curr = {}
+    for j, part in enumerate(curr_slice):
+        positions_in_curr.setdefault(part, []).append(j)
+
+    # Longest common run: run_lengths[j] is the length of the run ending at
+    # (previous item, curr_slice[j]); only runs that continue are carried forward
+    match_prev = match_curr = match_size = 0
+    run_lengths = {}
+    for i, part in enumerate(prev_slice):
+        next_run_lengths = {}
+        for j in positions_in_curr.get(part, ()):
+            size = next_run_lengths[j] = run_lengths.get(j - 1, 0) + 1
+            if size > match_size:
+                match_prev, match_curr, match_size = i - size + 1, j - size + 1, size
+        run_lengths = next_run_lengths
 
     if DEBUG_MODE:
-        print(f"\n  Overlap Check (SequenceMatcher):")
+        print(f"\n  Overlap Check (longest common run):")
         print(f"    Comparing last {len(prev_slice)} of prev ({len_prev} total) with {len(curr_slice)} of current.")
-        print(f"    Longest match details: prev_idx={match.a}, curr_idx={match.b}, size={match.size}")
+        print(f"    Longest match details: prev_idx={match_prev}, curr_idx={match_curr}, size={match_size}")
         # Optional: print matched content for debugging
-        # if match.size > 0:
-        #     print(f"      Match in prev_slice: {prev_slice[match.a : match.a + match.size]}")
-        #     print(f"      Match in curr_slice: {curr_slice[match.b : match.b + match.size]}")
+        # if match_size > 0:
+        #     print(f"      Match in prev_slice: {prev_slice[match_prev : match_prev + match_size]}")
+        #     print(f"      Match in curr_slice: {curr_slice[match_curr : match_curr + match_size]}")
 
     # Check if the longest match found is sufficiently long
-    if match.size >= min_len:
+    if match_size >= min_len:
         # If a good match is found, assume the new content starts right after
         # this match ends *in the current_parts list*.
-        new_content_start_index = match.b + match.size
+        new_content_start_index = match_curr + match_size
         if DEBUG_MODE:
-            print(f"  ----> Valid overlap confirmed. Size: {match.size}. New content starts at index {new_content_start_index} in current_parts.")
+            print(f"  ----> Valid overlap confirmed. Size: {match_size}. New content starts at index {new_content_start_index} in current_parts.")
         # Ensure index doesn't exceed current_parts length (shouldn't happen with find_longest_match logic)
         return min(new_content_start_index, len_curr)
     else:
         # No sufficiently long common subsequence found. Assume no overlap.
         if DEBUG_MODE:
-            print(f"  ----> No significant overlap found. Longest match ({match.size}) < min_len ({min_len}). Treating all current parts as new.")
+            print(f"  ----> No significant overlap found. Longest match ({match_size}) < min_len ({min_len}). Treating all current parts as new.")
         return 0 # Return 0 to indicate all of current_parts is new
 
 
+def write_combined_transcript(all_parts, out_file):
+    """
+    Writes the combined transcript parts to a text stream, merging consecutive
+    messages from the same speaker.
+
+    Args:
+        all_parts (iterable): (speaker, text) tuples in transcript order.
+        out_file: A writable text stream (e.g. an open output file).
+    """
+    separator = "" # Blocks are separated by a blank line; the last one ends with a single newline
+
+    # Consecutive messages from the same speaker form one block
+    for speaker, speaker_parts in groupby(all_parts, key=itemgetter(0)):
+        if not speaker: # Messages without a speaker name are not written
+            continue
+        full_message = " ".join([text for _, text in speaker_parts]).strip()
+        if full_message:
+            # Add speaker tag and the accumulated text
+            out_file.write(f"{separator}[{speaker}]\n{full_message}\n")
+            separator = "\n"
+
+
 def format_combined_transcript(all_parts):
     """
     Formats the combined list of transcript parts, merging consecutive messages
@@ -260,36 +506,41 @@ def format_combined_transcript(all_parts):
     Returns:
         str: The final formatted transcript text.
     """
-    if not all_parts:
-        return ""
-
-    formatted_lines = []
-    current_speaker = None
-    current_text_buffer = []
-
-    def flush_buffer():
-        nonlocal current_speaker, current_text_buffer, formatted_lines
-        if current_speaker and current_text_buffer:
-            full_message = " ".join(current_text_buffer).strip()
-            if full_message:
-                # Add speaker tag and the accumulated text
-                formatted_lines.append(f"[{current_speaker}]")
-                formatted_lines.append(f"{full_message}\n") # Extra newline for readability
-        current_text_buffer = [] # Reset buffer
-
-    for speaker, text in all_parts:
-        if speaker == current_speaker:
-            # Same speaker, append text to buffer
-            current_text_buffer.append(text)
-        else:
-            # Speaker change: flush previous buffer and start new one
-            flush_buffer()
-            current_speaker = speaker
-            current_text_buffer.append(text)
+    output = io.StringIO()
+    write_combined_transcript(all_parts, output)
+    return output.getvalue()
 
-    flush_buffer() # Flush the last speaker's text
 
-    return "\n".join(formatted_lines)
+def _iter_json_files(dir_path):
+    """
+    Yields the .json files (any letter case) under a directory, walking
+    subdirectories the way os.walk does: a directory's own files come before
+    its subdirectories, symlinked directories are not followed, and
+    unreadable subdirectories are skipped.
+
+    Args:
+        dir_path (str): The directory to scan.
+
+    Yields:
+        os.DirEntry: One entry per JSON file; entry.path joins dir_path and the name.
+    """
+    subdirs = []
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir() # Cached from the directory listing on macOS/Linux
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif entry.name.lower().endswith(".json"):
+                    yield entry
+    except OSError:
+        return
+    for subdir in subdirs:
+        yield from _iter_json_files(subdir)
 
 # --- Main Function ---
 
@@ -309,15 +560,12 @@ def process_teams_directory(input_dir_path):
     # Find and sort JSON files by timestamp in filename
     json_files = []
     print("Scanning for JSON files...")
-    for root, _, files in os.walk(input_dir_path):
-        for file in files:
-            if file.lower().endswith(".json"):
-                full_path = os.path.join(root, file)
-                timestamp = get_timestamp_from_filename(file)
-                if timestamp:
-                    json_files.append((timestamp, full_path))
-                else:
-                    print(f"Warning: Skipping file due to missing/unparsable timestamp: {full_path}")
+    for entry in _iter_json_files(input_dir_path):
+        timestamp = get_timestamp_from_filename(entry.name)
+        if timestamp:
+            json_files.append((timestamp, entry.path))
+        else:
+            print(f"Warning: Skipping file due to missing/unparsable timestamp: {entry.path}")
 
     if not json_files:
         print(f"Error: No JSON files with valid timestamps found in '{input_dir_path}'")
@@ -342,64 +590,78 @@ def process_teams_directory(input_dir_path):
     output_file_path = os.path.join(OUTPUT_BASE_DIR, output_file_name)
     print(f"Output will be saved to: {output_file_path}")
 
-    # Process files chronologically and stitch them
-    all_transcript_parts = []
+    # Process files chronologically and stitch them. New parts from each file are kept as one
+    # segment and joined once at the end; overlap detection only needs the most recent parts.
+    transcript_segments = []
+    recent_parts = [] # Last OVERLAP_LOOKBACK_PREVIOUS stitched parts
+    total_parts = 0
     last_progress_msg_len = 0 # Track length for clearing progress line
 
-    for i, (timestamp, file_path) in enumerate(json_files):
-        progress_msg = f"Processing file {i+1}/{len(json_files)}: {os.path.basename(file_path)}..."
-        # Print progress message, overwriting previous one
-        print(progress_msg + " " * (last_progress_msg_len - len(progress_msg)), end='\r', flush=True)
-        last_progress_msg_len = len(progress_msg)
-        if DEBUG_MODE: print(f"\n{progress_msg}") # Print clearly on new line in debug mode
-
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+    # Files are parsed independently (in worker processes when there are enough of them);
+    # results come back in chronological order so stitching stays sequential.
+    file_paths = [file_path for _, file_path in json_files]
+    executor = None
+    if not DEBUG_MODE and len(file_paths) >= PARALLEL_PARSE_MIN_FILES: # Keep debug output in order
+        executor = ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, PARALLEL_PARSE_MAX_WORKERS, len(file_paths)))
+        loaded_parts = executor.map(_load_transcript_parts_safely, file_paths, chunksize=PARALLEL_PARSE_CHUNKSIZE)
+    else:
+        loaded_parts = map(_load_transcript_parts_safely, file_paths) # Lazy: each file loads when reached
 
-            # *** Use the new robust function here ***
-            current_parts = find_transcript_parts_teams_robust(data)
+    try:
+        for i, file_path in enumerate(file_paths):
+            progress_msg = f"Processing file {i+1}/{len(json_files)}: {os.path.basename(file_path)}..."
+            # Print progress message, overwriting previous one
+            print(progress_msg + " " * (last_progress_msg_len - len(progress_msg)), end='\r', flush=True)
+            last_progress_msg_len = len(progress_msg)
+            if DEBUG_MODE: print(f"\n{progress_msg}") # Print clearly on new line in debug mode
+
+            # *** Use the new robust function here (cached per unchanged file) ***
+            current_parts, error = next(loaded_parts)
+            if error:
+                is_decode_error, message = error
+                reason = "JSON decode error" if is_decode_error else "read/parse error"
+                # Print warning on a new line so it doesn't get overwritten by progress
+                print(f"\nWarning: Skipping file {os.path.basename(file_path)} due to {reason}: {message}")
+                continue # Continue with the next file
 
             if not current_parts:
-                 if DEBUG_MODE: print("  No transcript parts found or extracted in this file.")
-                 continue # Skip files where no parts were found/extracted
-
-        except json.JSONDecodeError as e:
-            # Print warning on a new line so it doesn't get overwritten by progress
-            print(f"\nWarning: Skipping file {os.path.basename(file_path)} due to JSON decode error: {e}")
-            continue
-        except Exception as e:
-            # Print warning on a new line so it doesn't get overwritten by progress
-            print(f"\nWarning: Skipping file {os.path.basename(file_path)} due to read/parse error: {e}")
-            continue # Continue with the next file
-
-        if not all_transcript_parts: # This is the first file with content
-            all_transcript_parts.extend(current_parts)
-            if DEBUG_MODE: print(f"  Added {len(current_parts)} parts from the first file with content.")
-        else:
-            # Find where new content starts in current_parts based on overlap with the end of all_transcript_parts
-            new_content_start_idx = find_best_overlap_index(
-                all_transcript_parts,
-                current_parts,
-                lookback_prev=OVERLAP_LOOKBACK_PREVIOUS,
-                min_len=MIN_OVERLAP_LENGTH
-            )
-
-            # Add only the non-overlapping parts from the current file
-            if new_content_start_idx < len(current_parts):
-                new_parts_to_add = current_parts[new_content_start_idx:]
-                all_transcript_parts.extend(new_parts_to_add)
-                if DEBUG_MODE: print(f"  Overlap handled. Added {len(new_parts_to_add)} new parts (from index {new_content_start_idx}). Total parts now: {len(all_transcript_parts)}")
-            elif DEBUG_MODE:
-                # This means the heuristic determined the entire current file overlapped
-                print(f"  All {len(current_parts)} items considered overlap (start index {new_content_start_idx}). Nothing new added.")
+                if DEBUG_MODE: print("  No transcript parts found or extracted in this file.")
+                continue # Skip files where no parts were found/extracted
+
+            if not transcript_segments: # This is the first file with content
+                transcript_segments.append(current_parts)
+                recent_parts = current_parts[-OVERLAP_LOOKBACK_PREVIOUS:]
+                total_parts = len(current_parts)
+                if DEBUG_MODE: print(f"  Added {len(current_parts)} parts from the first file with content.")
+            else:
+                # Find where new content starts in current_parts based on overlap with the most recent parts
+                new_content_start_idx = find_best_overlap_index(
+                    recent_parts,
+                    current_parts,
+                    lookback_prev=OVERLAP_LOOKBACK_PREVIOUS,
+                    min_len=MIN_OVERLAP_LENGTH
+                )
+
+                # Add only the non-overlapping parts from the current file
+                if new_content_start_idx < len(current_parts):
+                    new_parts_to_add = current_parts[new_content_start_idx:] if new_content_start_idx else current_parts
+                    transcript_segments.append(new_parts_to_add)
+                    recent_parts = (recent_parts + new_parts_to_add[-OVERLAP_LOOKBACK_PREVIOUS:])[-OVERLAP_LOOKBACK_PREVIOUS:]
+                    total_parts += len(new_parts_to_add)
+                    if DEBUG_MODE: print(f"  Overlap handled. Added {len(new_parts_to_add)} new parts (from index {new_content_start_idx}). Total parts now: {total_parts}")
+                elif DEBUG_MODE:
+                    # This means the heuristic determined the entire current file overlapped
+                    print(f"  All {len(current_parts)} items considered overlap (start index {new_content_start_idx}). Nothing new added.")
+    finally:
+        if executor:
+            executor.shutdown()
 
     # Clear the final progress indicator line before printing summary
     print(" " * last_progress_msg_len, end='\r')
 
-    print(f"\nProcessing complete. Total unique transcript parts collected: {len(all_transcript_parts)}")
+    print(f"\nProcessing complete. Total unique transcript parts collected: {total_parts}")
 
-    if not all_transcript_parts:
+    if not total_parts:
         print("Warning: No transcript content found after processing all files.")
         # Write an empty file
         try:
@@ -410,13 +672,10 @@ def process_teams_directory(input_dir_path):
             print(f"An error occurred while writing the empty output file '{output_file_path}': {e}")
         return # Exit gracefully
 
-    # Format the combined transcript
-    formatted_output = format_combined_transcript(all_transcript_parts)
-
-    # Write the final output
+    # Format the combined transcript straight into the output file
     try:
         with open(output_file_path, "w", encoding="utf-8") as f:
-            f.write(formatted_output)
+            write_combined_transcript(chain.from_iterable(transcript_segments), f)
         print(f"Combined transcript successfully written to {output_file_path}")
     except IOError as e:
         print(f"An error occurred while writing the output file '{output_file_path}': {e}")
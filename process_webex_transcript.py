@@ -5,11 +5,37 @@
 import json
 import sys
 import os
+try:
+    import orjson # Optional: much faster JSON decoding for large exports
+except ImportError:
+    orjson = None
 
 # --- Configuration ---
 OUTPUT_BASE_DIR = "processed_transcripts"
 
-# --- Helper Function ---
+# --- Helper Functions ---
+
+def _load_json(file_path):
+    """
+    Decodes a JSON file, with orjson when available.
+
+    Args:
+        file_path (str): Path to the JSON file.
+
+    Returns:
+        The decoded JSON value (dicts and lists, as json.load returns).
+
+    Raises:
+        json.JSONDecodeError, OSError: If the file cannot be read or parsed.
+    """
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    if orjson:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass # Let the stdlib decoder accept what orjson rejects (e.g. NaN) or report the error
+    return json.loads(raw)
 
 def _find_webex_table(node):
     """
@@ -57,6 +83,7 @@ def parse_webex_json(data):
         return [] # Return empty list if table not found
 
     rows = table_node.get("children", [])
+    append_part = transcript_parts.append # Bound once for the row loop
 
     for row in rows:
         if row.get("role") != "AXRow":
@@ -72,11 +99,11 @@ def parse_webex_json(data):
 
         for child in cell_children:
             role = child.get("role")
-            value = child.get("value", "") # Use value consistently
 
             if role == "AXStaticText":
+                value = child.get("value", "") # Use value consistently
                 # Basic check for timestamp format (HH:MM or HH:MM:SS)
-                if ":" in value and (value.count(":") == 1 or value.count(":") == 2):
+                if value.count(":") in (1, 2):
                     timestamp = value.strip()
                 else:
                     speaker = value.strip()
@@ -89,7 +116,7 @@ def parse_webex_json(data):
 
         # Only add if all parts were found
         if speaker and timestamp and dialogue:
-            transcript_parts.append((speaker, timestamp, dialogue))
+            append_part((speaker, timestamp, dialogue))
         # Optional: Add warning if parts are missing for a row?
         # else:
         #     print(f"Warning: Skipping row due to missing data. Found: Speaker='{speaker}', Timestamp='{timestamp}', Dialogue='{dialogue}'")
@@ -147,8 +174,7 @@ def process_webex_file(input_file_path):
 
     # Read and parse the JSON file
     try:
-        with open(input_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _load_json(input_file_path)
     except json.JSONDecodeError as e:
         print(f"Error: Failed to decode JSON from '{input_file_path}': {e}")
         sys.exit(1)
@@ -1,62 +1,125 @@
 import json
 import sys
 import os
+import io
+from concurrent.futures import ProcessPoolExecutor # For converting a directory of exports in parallel
+from itertools import repeat
+try:
+    import orjson # Optional: much faster JSON decoding for large exports
+except ImportError:
+    orjson = None
 
 # --- Configuration ---
 OUTPUT_BASE_DIR = "processed_transcripts"
+# Output file buffer size; segments are written one at a time, so a large buffer keeps write calls few
+OUTPUT_BUFFER_SIZE = 1 << 20 # 1 MiB
+# Records which input (mtime and size) each finished transcript was converted from, for --skip-unchanged
+STAMP_DIR = os.path.join(OUTPUT_BASE_DIR, ".zoom_stamps")
 
 # --- Core Processing Functions ---
 
-def parse_zoom_json(data):
+def _load_json(file_path):
     """
-    Parses the Zoom JSON data structure to extract transcript parts.
+    Decodes a JSON file, with orjson when available.
 
     Args:
-        data (dict): The loaded JSON data from the Zoom export file.
+        file_path (str): Path to the JSON file.
 
     Returns:
-        list: A list of tuples, where each tuple contains
-              (speaker, timestamp, dialogue_text). Returns empty list if no
-              valid data is found.
+        The decoded JSON value (dicts and lists, as json.load returns).
+
+    Raises:
+        json.JSONDecodeError, OSError: If the file cannot be read or parsed.
+    """
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    if orjson:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass # Let the stdlib decoder accept what orjson rejects (e.g. NaN) or report the error
+    return json.loads(raw)
+
+
+def _join_dialogue(fragments):
+    """
+    Joins stripped text fragments into one dialogue string.
+
+    Args:
+        fragments (list): Non-empty list of already stripped text fragments.
+
+    Returns:
+        str: The fragments joined by single spaces, without leading/trailing
+             whitespace.
+    """
+    dialogue = ' '.join(fragments)
+    # Fragments are stripped on insert, so only an empty first/last fragment leaves an edge space
+    if not (fragments[0] and fragments[-1]):
+        dialogue = dialogue.strip()
+    return dialogue
+
+
+def iter_zoom_segments(data):
+    """
+    Parses the Zoom JSON data structure, yielding each transcript part as
+    soon as its speaker block or timestamp line is complete.
+
+    Args:
+        data (dict): The loaded JSON data from the Zoom export file.
+
+    Yields:
+        tuple: (speaker, timestamp, dialogue_text) for each transcript part.
     """
-    transcript_parts = []
     current_speaker = None
     current_timestamp = None
     current_text_buffer = []
+    speaker_names = {} # Raw speaker cell value -> cleaned name, shared by all of that speaker's segments
 
     for row in data.get('children', []):
-        cells = row.get('children', [])
-        if not cells:
-            continue  # Skip rows without cells
-
-        cell_contents = cells[0].get('children', [])
+        # Exports nearly always have these keys, so index directly rather than .get() with defaults
+        try:
+            cell_contents = row['children'][0]['children']
+        except (KeyError, IndexError):
+            continue # Skip rows without cells
         if not cell_contents:
             continue # Skip cells without content
 
-        # Extract text values and check for speaker image marker
-        cell_values = [item.get('value', '') for item in cell_contents if item.get('role') == 'AXTextArea']
-        has_image = any(item.get('role') == 'AXImage' for item in cell_contents)
+        # Extract text values and check for speaker image marker in one pass
+        cell_values = []
+        has_image = False
+        for item in cell_contents:
+            role = item.get('role')
+            if role == 'AXTextArea':
+                cell_values.append(item.get('value', ''))
+            elif role == 'AXImage':
+                has_image = True
 
         if has_image:
             # Flush previous speaker block if any
             if current_speaker and current_text_buffer and current_timestamp:
-                dialogue = ' '.join(current_text_buffer).strip()
+                dialogue = _join_dialogue(current_text_buffer)
                 if dialogue:
-                    transcript_parts.append((current_speaker, current_timestamp, dialogue))
+                    yield current_speaker, current_timestamp, dialogue
                 current_text_buffer = [] # Reset buffer
                 current_timestamp = None # Reset timestamp
 
             # Start new speaker block
-            current_speaker = cell_values[0].strip() if cell_values else "Unknown Speaker"
+            if cell_values:
+                raw_speaker = cell_values[0]
+                current_speaker = speaker_names.get(raw_speaker)
+                if current_speaker is None:
+                    current_speaker = speaker_names[raw_speaker] = raw_speaker.strip()
+            else:
+                current_speaker = "Unknown Speaker"
 
         elif cell_values and current_speaker: # Process timestamp and text lines
             # Check if the first value looks like a timestamp (HH:MM:SS)
             if len(cell_values) >= 2 and cell_values[0].count(':') == 2:
                 # Flush previous text for the same speaker if timestamp changes
                 if current_text_buffer and current_timestamp:
-                    dialogue = ' '.join(current_text_buffer).strip()
+                    dialogue = _join_dialogue(current_text_buffer)
                     if dialogue:
-                        transcript_parts.append((current_speaker, current_timestamp, dialogue))
+                        yield current_speaker, current_timestamp, dialogue
                     current_text_buffer = [] # Reset buffer
 
                 # Assign new timestamp and start new text line
@@ -68,11 +131,44 @@ def parse_zoom_json(data):
 
     # Flush any remaining text after the loop
     if current_speaker and current_timestamp and current_text_buffer:
-        dialogue = ' '.join(current_text_buffer).strip()
+        dialogue = _join_dialogue(current_text_buffer)
         if dialogue:
-            transcript_parts.append((current_speaker, current_timestamp, dialogue))
+            yield current_speaker, current_timestamp, dialogue
+
+
+def parse_zoom_json(data):
+    """
+    Parses the Zoom JSON data structure to extract transcript parts.
+
+    Args:
+        data (dict): The loaded JSON data from the Zoom export file.
+
+    Returns:
+        list: A list of tuples, where each tuple contains
+              (speaker, timestamp, dialogue_text). Returns empty list if no
+              valid data is found.
+    """
+    return list(iter_zoom_segments(data))
+
+
+def write_transcript(transcript_parts, out_file):
+    """
+    Writes the extracted transcript parts to a text stream, one segment at a time.
+
+    Args:
+        transcript_parts (iterable): (speaker, timestamp, dialogue) tuples.
+        out_file: A writable text stream (e.g. an open output file).
 
-    return transcript_parts
+    Returns:
+        int: The number of segments written.
+    """
+    separator = "" # Segments are separated by a blank line for readability
+    segment_count = 0
+    for speaker, timestamp, dialogue in transcript_parts:
+        out_file.write(f"{separator}[{speaker}] {timestamp}\n{dialogue}\n")
+        separator = "\n"
+        segment_count += 1
+    return segment_count
 
 
 def format_transcript(transcript_parts):
@@ -85,20 +181,33 @@ def format_transcript(transcript_parts):
     Returns:
         str: The formatted transcript as a single string.
     """
-    output_lines = []
-    for speaker, timestamp, dialogue in transcript_parts:
-        output_lines.append(f"[{speaker}] {timestamp}")
-        output_lines.append(f"{dialogue}\n") # Add extra newline for readability
-    return "\n".join(output_lines)
+    output = io.StringIO()
+    write_transcript(transcript_parts, output)
+    return output.getvalue()
 
 # --- Main Function ---
 
-def process_zoom_file(input_file_path):
+def _input_signature(input_file_path):
+    """
+    Describes the current version of an input file for the up-to-date check.
+
+    Args:
+        input_file_path (str): The path to the input Zoom JSON file.
+
+    Returns:
+        str: The file's modification time (ns) and size.
+    """
+    st = os.stat(input_file_path)
+    return f"{st.st_mtime_ns} {st.st_size}"
+
+def process_zoom_file(input_file_path, skip_unchanged=False):
     """
     Main function to process a single Zoom transcript JSON file.
 
     Args:
         input_file_path (str): The path to the input Zoom JSON file.
+        skip_unchanged (bool): If True, skip the file when its output transcript
+                               was already converted from this exact input.
     """
     print(f"Processing Zoom transcript file: {input_file_path}")
 
@@ -121,10 +230,22 @@ def process_zoom_file(input_file_path):
     output_file_path = os.path.join(OUTPUT_BASE_DIR, output_file_name)
     print(f"Output will be saved to: {output_file_path}")
 
+    # Optionally skip inputs whose transcript was finished from this same version of the export
+    # (the stamp is only written after a successful conversion, so a failed one is always retried)
+    stamp_path = os.path.join(STAMP_DIR, output_file_name)
+    if skip_unchanged:
+        try:
+            with open(stamp_path, encoding='utf-8') as f:
+                up_to_date = f.read() == _input_signature(input_file_path) and os.path.isfile(output_file_path)
+        except OSError:
+            up_to_date = False # No stamp (or it can't be read); convert as usual
+        if up_to_date:
+            print("Output is already up to date; skipping (run without --skip-unchanged to convert again).")
+            return
+
     # Read and parse the JSON file
     try:
-        with open(input_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _load_json(input_file_path)
     except json.JSONDecodeError as e:
         print(f"Error: Failed to decode JSON from '{input_file_path}': {e}")
         sys.exit(1)
@@ -132,36 +253,108 @@ def process_zoom_file(input_file_path):
         print(f"Error reading file '{input_file_path}': {e}")
         sys.exit(1)
 
-    # Extract transcript parts
-    transcript_parts = parse_zoom_json(data)
-    if not transcript_parts:
+    # Extract transcript parts and format each one straight into a temp file as it is found,
+    # then move it into place only once the whole input parsed
+    # (an empty file still indicates processing occurred but found nothing)
+    tmp_output_path = f"{output_file_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_output_path, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as out_file:
+            segment_count = write_transcript(iter_zoom_segments(data), out_file)
+        os.replace(tmp_output_path, output_file_path)
+    except IOError as e:
+        print(f"Error writing output file '{output_file_path}': {e}")
+        sys.exit(1)
+    finally:
+        # A failed conversion leaves no partial transcript behind (and keeps any previous one)
+        try:
+            os.remove(tmp_output_path)
+        except FileNotFoundError:
+            pass
+
+    # Record which input this transcript came from; without it the file is just reconverted next time
+    try:
+        os.makedirs(STAMP_DIR, exist_ok=True)
+        with open(stamp_path, 'w', encoding='utf-8') as f:
+            f.write(_input_signature(input_file_path))
+    except OSError as e:
+        print(f"Warning: Could not record conversion stamp '{stamp_path}': {e}")
+        print("         --skip-unchanged will convert this file again.")
+
+    if not segment_count:
         print("Warning: No transcript parts could be extracted.")
-        # Write an empty file to indicate processing occurred but found nothing
-        with open(output_file_path, 'w', encoding='utf-8') as out_file:
-            out_file.write("")
         print(f"Empty transcript file written to {output_file_path}")
         return # Exit gracefully
 
-    print(f"Successfully extracted {len(transcript_parts)} transcript segments.")
+    print(f"Successfully extracted {segment_count} transcript segments.")
+    print(f"Successfully converted transcript to {output_file_path}")
 
-    # Format the transcript
-    formatted_output = format_transcript(transcript_parts)
+def _process_zoom_file_safely(input_file_path, skip_unchanged=False):
+    """
+    Runs process_zoom_file for one file of a batch, reporting failure instead
+    of exiting so the other files still get converted.
+
+    Args:
+        input_file_path (str): The path to the input Zoom JSON file.
+        skip_unchanged (bool): Passed through to process_zoom_file.
 
-    # Write the output file
+    Returns:
+        bool: True if the file was processed, False if it exited with an error.
+    """
     try:
-        with open(output_file_path, 'w', encoding='utf-8') as out_file:
-            out_file.write(formatted_output)
-        print(f"Successfully converted transcript to {output_file_path}")
-    except IOError as e:
-        print(f"Error writing output file '{output_file_path}': {e}")
+        process_zoom_file(input_file_path, skip_unchanged)
+        return True
+    except SystemExit as e:
+        return not e.code
+    except Exception as e:
+        # Unexpected data (e.g. a top level that isn't an object) shouldn't abort the whole batch
+        print(f"Error processing '{input_file_path}': {e}")
+        return False
+
+
+def process_zoom_directory(input_dir_path, skip_unchanged=False):
+    """
+    Processes every Zoom transcript JSON file directly inside a directory,
+    one file per worker process.
+
+    Args:
+        input_dir_path (str): The path to a directory of Zoom JSON files.
+        skip_unchanged (bool): If True, skip files whose output transcript was
+                               already converted from the same input.
+    """
+    with os.scandir(input_dir_path) as entries:
+        json_paths = sorted(entry.path for entry in entries
+                            if entry.name.lower().endswith(".json") and entry.is_file())
+    if not json_paths:
+        print(f"Error: No JSON files found in '{input_dir_path}'")
+        sys.exit(1)
+
+    print(f"Processing {len(json_paths)} Zoom transcript files in: {input_dir_path}")
+    # Files are independent, so convert them in parallel (output lines from workers may interleave)
+    with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, len(json_paths))) as executor:
+        results = list(executor.map(_process_zoom_file_safely, json_paths, repeat(skip_unchanged)))
+
+    failed = [path for path, ok in zip(json_paths, results) if not ok]
+    if failed:
+        print(f"\nWarning: {len(failed)} of {len(json_paths)} files could not be processed:")
+        for path in failed:
+            print(f"  {path}")
         sys.exit(1)
+    print(f"\nAll {len(json_paths)} files processed.")
 
 # --- Script Execution ---
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python process_zoom_transcript.py <path_to_zoom_export.json>")
+    cli_args = sys.argv[1:]
+    # Optional: only convert exports that changed since their transcript was last written
+    skip_unchanged = "--skip-unchanged" in cli_args
+    if skip_unchanged:
+        cli_args.remove("--skip-unchanged")
+    if len(cli_args) != 1:
+        print("Usage: python process_zoom_transcript.py [--skip-unchanged] <path_to_zoom_export.json | directory_of_zoom_exports>")
         sys.exit(1)
 
-    input_path = sys.argv[1]
-    process_zoom_file(input_path)
+    input_path = cli_args[0]
+    if os.path.isdir(input_path):
+        process_zoom_directory(input_path, skip_unchanged)
+    else:
+        process_zoom_file(input_path, skip_unchanged)